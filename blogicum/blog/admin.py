@@ -1,18 +1,109 @@
 from django.contrib import admin
+from django.db.models.functions import Substr
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 
 from .models import Category, Comment, Location, Post
+from .moderation import (
+    CHUNK_SIZE, pk_chunks, set_published, set_published_chunk,
+    start_in_background
+)
+from .paginators import EstimatedCountPaginator
 
+TEXT_PREVIEW_LENGTH = 100
+INLINE_POSTS = 10
 
-class PostInline(admin.StackedInline):
+
+class LatestPostsFormSet(BaseInlineFormSet):
+    """Формы только для последних INLINE_POSTS публикаций."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not queryset.query.is_sliced:
+            self._queryset = queryset = queryset[:INLINE_POSTS]
+        return queryset
+
+
+class PostInline(admin.TabularInline):
     model = Post
+    formset = LatestPostsFormSet
+    verbose_name_plural = 'Последние публикации'
+    fields = (
+        'title',
+        'pub_date',
+        'author',
+        'is_published'
+    )
+    readonly_fields = fields
+    show_change_link = True
+    can_delete = False
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'author'
+        ).only(
+            *self.fields, 'category', 'location'
+        ).order_by('-pub_date', '-pk')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class PublishActionsMixin:
+    """Действия «опубликовать» и «снять с публикации» для выбранного.
+
+    Объекты меняются пачками одним UPDATE на пачку. Первая пачка
+    обрабатывается в запросе, остальные — в фоновом потоке.
+    """
+
+    actions = ('publish', 'unpublish')
+
+    def change_published(self, request, queryset, is_published):
+        chunks = pk_chunks(queryset)
+        first_chunk = next(chunks, [])
+        updated = set_published_chunk(self.model, first_chunk, is_published)
+        if len(first_chunk) < CHUNK_SIZE:
+            self.message_user(request, f'Изменено объектов: {updated}.')
+            return
+        start_in_background(set_published, self.model, chunks, is_published)
+        self.message_user(
+            request,
+            f'Изменено объектов: {updated}, остальные изменяются в фоне.',
+        )
+
+    @admin.action(description='Опубликовать выбранные')
+    def publish(self, request, queryset):
+        self.change_published(request, queryset, True)
+
+    @admin.action(description='Снять с публикации выбранные')
+    def unpublish(self, request, queryset):
+        self.change_published(request, queryset, False)
+
+
+class PostListMixin:
+    """Ссылка на полный список публикаций объекта в админке."""
+
+    post_lookup = None
+    readonly_fields = ('post_list',)
+
+    @admin.display(description='Публикации')
+    def post_list(self, obj):
+        if obj.pk is None:
+            return self.get_empty_value_display()
+        url = reverse('admin:blog_post_changelist')
+        return format_html(
+            '<a href="{}?{}__id__exact={}">Все публикации</a>',
+            url, self.post_lookup, obj.pk
+        )
+
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = (
         'title',
-        'text',
+        'text_preview',
         'is_published',
         'created_at',
         'pub_date',
@@ -30,10 +121,39 @@ class PostAdmin(admin.ModelAdmin):
         'pub_date'
     )
     list_display_links = ('title',)
+    list_select_related = (
+        'author',
+        'location',
+        'category'
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            'text', 'text_html'
+        ).annotate(text_preview=Substr('text', 1, TEXT_PREVIEW_LENGTH))
+
+    @admin.display(description='Текст')
+    def text_preview(self, obj):
+        return obj.text_preview
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name == 'category' and formfield is not None:
+            # В списке поле редактируется в каждой строке:
+            # варианты выбираются из базы один раз за запрос.
+            if not hasattr(request, '_category_choices'):
+                request._category_choices = [*iter(formfield.choices)]
+            formfield.choices = request._category_choices
+        return formfield
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(PublishActionsMixin, PostListMixin, admin.ModelAdmin):
+    post_lookup = 'category'
     inlines = (
         PostInline,
     )
@@ -48,7 +168,8 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(PublishActionsMixin, PostListMixin, admin.ModelAdmin):
+    post_lookup = 'location'
     inlines = (
         PostInline,
     )
@@ -64,7 +185,41 @@ class LocationAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
         'text',
+        'post',
+        'author',
+        'created_at'
     )
+    list_select_related = (
+        'post',
+        'author'
+    )
+    list_filter = ('created_at',)
+    search_fields = (
+        'text',
+        '=author__username'
+    )
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    ordering = ('-pk',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_readonly_fields(self, request, obj=None):
+        # Счётчики comment_count учитывают только создание и удаление,
+        # поэтому перенести существующий комментарий нельзя.
+        if obj is not None:
+            return (*super().get_readonly_fields(request, obj), 'post')
+        return super().get_readonly_fields(request, obj)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            'post__text', 'post__text_html'
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.search(search_term), False
 
 
 admin.site.empty_value_display = 'Не задано'
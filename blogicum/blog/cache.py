@@ -0,0 +1,148 @@
+import time
+from hashlib import md5
+
+from django.core.cache import cache
+from django.utils import timezone
+
+VERSION_KEY_PREFIX = 'blog:version:'
+CHANGED_AT_KEY_PREFIX = 'blog:changed_at:'
+FEED = 'feed'
+FEED_ETAG_DEPENDENCIES = (FEED, 'comment', 'location', 'user')
+FEED_TABLES = ('category', 'comment', 'location', 'post', 'user')
+POST_ETAG_DEPENDENCIES = ('category', 'location', 'user')
+FEED_CACHE_MAX_TIMEOUT = 60 * 60
+PAGE_KEY_PREFIX = 'blog:page:'
+PAGE_HITS_KEY = 'blog:page_cache:hits'
+PAGE_MISSES_KEY = 'blog:page_cache:misses'
+
+
+def version_name(obj):
+    """Имя версии объекта модели, например ``post:5``."""
+    return f'{obj._meta.model_name}:{obj.pk}'
+
+
+def get_versions(names):
+    """Текущие версии по именам.
+
+    Отсутствующая версия заводится от текущего времени, чтобы после
+    вытеснения из кэша она не совпала ни с одной из прежних.
+    """
+    keys = {VERSION_KEY_PREFIX + name: name for name in names}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_version(name):
+    return get_versions((name,))[name]
+
+
+def bump_versions(*names):
+    """Сдвигает версии одной операцией кэша.
+
+    Новые значения берутся от текущего времени, как у вновь заведённых
+    версий, поэтому не совпадают с прежними. Это запись, а не
+    cache.incr: в общем кэше incr читает и пишет отдельно, и два
+    процесса могли бы записать одну и ту же версию.
+    """
+    version = time.time_ns()
+    cache.set_many(
+        {VERSION_KEY_PREFIX + name: version for name in names}, None
+    )
+
+
+def touch_tables(*tables):
+    """Отмечает изменение таблиц: сдвигает их версии и время изменения."""
+    bump_versions(*tables)
+    now = timezone.now()
+    cache.set_many(
+        {CHANGED_AT_KEY_PREFIX + table: now for table in tables}, None
+    )
+
+
+def get_last_modified(tables):
+    """Время последнего изменения таблиц.
+
+    Неизвестное время, например вытесненное из кэша, считается текущим.
+    """
+    keys = [CHANGED_AT_KEY_PREFIX + table for table in tables]
+    changed_at = cache.get_many(keys)
+    for key in set(keys) - changed_at.keys():
+        cache.add(key, timezone.now(), None)
+        changed_at[key] = cache.get(key)
+    return max(changed_at.values())
+
+
+def post_dependencies(post):
+    """Версии, от которых зависит отрисованная карточка публикации."""
+    dependencies = {f'post:{post.pk}', f'user:{post.author_id}'}
+    if post.category_id:
+        dependencies.add(f'category:{post.category_id}')
+    if post.location_id:
+        dependencies.add(f'location:{post.location_id}')
+    return dependencies
+
+
+def card_version(post, versions):
+    """Версия карточки публикации из версий её зависимостей."""
+    return '-'.join(
+        str(versions[name]) for name in sorted(post_dependencies(post))
+    )
+
+
+def make_etag(request, versions):
+    """Значение ETag страницы по версиям её зависимостей.
+
+    Для вошедшего пользователя в него входит ключ сессии: он меняется
+    при каждом входе вместе с секретом CSRF, и страница с формой из
+    кэша браузера не отправит устаревший токен.
+    """
+    if request.user.is_authenticated:
+        user = f'{request.user.pk}:{request.session.session_key}'
+    else:
+        user = 'anon'
+    values = sorted(versions.items())
+    return md5(f'{user}:{values}'.encode()).hexdigest()
+
+
+def feed_count_key(feed_key):
+    return f'blog:feed_count:{get_version(FEED)}:{feed_key}'
+
+
+def page_cache_key(path):
+    return PAGE_KEY_PREFIX + md5(path.encode()).hexdigest()
+
+
+def get_cached_page(key):
+    """Сохранённая страница, если не изменилась ни одна её зависимость."""
+    page = cache.get(key)
+    if page is not None and get_versions(page['versions']) != page['versions']:
+        page = None
+    _count(PAGE_MISSES_KEY if page is None else PAGE_HITS_KEY)
+    return page
+
+
+def set_cached_page(key, page, versions, timeout):
+    page['versions'] = versions
+    cache.set(key, page, timeout)
+
+
+def get_page_cache_stats():
+    stats = cache.get_many((PAGE_HITS_KEY, PAGE_MISSES_KEY))
+    hits = stats.get(PAGE_HITS_KEY, 0)
+    misses = stats.get(PAGE_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.template.loader import render_to_string
+from django.urls import Resolver404, resolve
+
+from blog.models import Post
+
+LIVE_COMMENTS_URL_NAME = 'blog:live_comments'
+HEARTBEAT_INTERVAL = 15
+RETRY_MS = 5000
+QUEUE_SIZE = 100
+
+
+class CommentBroker:
+    """Подписки на новые комментарии в пределах процесса.
+
+    Подписчики — очереди asyncio в цикле событий ASGI-сервера.
+    Публиковать можно из любого потока: сообщения передаются в цикл
+    через call_soon_threadsafe. Медленный подписчик с заполненной
+    очередью пропускает сообщения, а не задерживает остальных.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, post_id):
+        subscriber = (
+            asyncio.get_running_loop(), asyncio.Queue(maxsize=QUEUE_SIZE)
+        )
+        with self._lock:
+            self._subscribers[post_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, post_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(post_id, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(post_id, None)
+
+    def has_subscribers(self, post_id):
+        return post_id in self._subscribers
+
+    def publish(self, post_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(post_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, message)
+
+    @staticmethod
+    def _put(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+
+broker = CommentBroker()
+
+
+def format_event(event, event_id, data):
+    lines = ''.join(f'data: {line}\n' for line in data.splitlines())
+    return f'event: {event}\nid: {event_id}\n{lines}\n'.encode()
+
+
+def publish_comment(comment):
+    """Рассылает отрисованный комментарий подписчикам его публикации."""
+    if not broker.has_subscribers(comment.post_id):
+        return
+    html = render_to_string('includes/comment_list.html', {
+        'post': comment.post,
+        'comments': (comment,),
+    })
+    broker.publish(comment.post_id, format_event('comment', comment.pk, html))
+
+
+@sync_to_async
+def post_is_visible(post_id):
+    return Post.objects.visible().filter(pk=post_id).exists()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_comments(post_id, receive, send):
+    if not await post_is_visible(post_id):
+        await send({'type': 'http.response.start', 'status': 404})
+        await send({'type': 'http.response.body'})
+        return
+    subscriber = broker.subscribe(post_id)
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    message = None
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': (
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ),
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': f'retry: {RETRY_MS}\n\n'.encode(),
+            'more_body': True,
+        })
+        while not disconnect.done():
+            if message is None:
+                message = asyncio.ensure_future(subscriber[1].get())
+            await asyncio.wait(
+                (message, disconnect),
+                timeout=HEARTBEAT_INTERVAL,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnect.done():
+                break
+            if message.done():
+                body, message = message.result(), None
+            else:
+                body = b': heartbeat\n\n'
+            await send({
+                'type': 'http.response.body', 'body': body, 'more_body': True
+            })
+    finally:
+        broker.unsubscribe(post_id, subscriber)
+        for task in (message, disconnect):
+            if task is not None:
+                task.cancel()
+
+
+class LiveCommentsMiddleware:
+    """ASGI-обёртка, которая сама обслуживает поток комментариев (SSE).
+
+    Соединение держит одна сопрограмма без потока из пула Django, поэтому
+    тысячи простаивающих читателей почти ничего не стоят. Остальные
+    запросы передаются приложению Django.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            try:
+                match = resolve(scope['path'])
+            except Resolver404:
+                match = None
+            if match is not None and (
+                match.view_name == LIVE_COMMENTS_URL_NAME
+            ):
+                return await stream_comments(
+                    match.kwargs['post_id'], receive, send
+                )
+        return await self.app(scope, receive, send)
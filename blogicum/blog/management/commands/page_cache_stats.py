@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import get_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша страниц для анонимов.'
+
+    def handle(self, *args, **options):
+        stats = get_page_cache_stats()
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["hit_ratio"]:.1%}'
+        )
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.visibility import (
+    get_next_publication, publish_due_posts, quantized_now,
+    reset_next_publication
+)
+
+MAX_SLEEP = 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает отложенные публикации в момент наступления их даты '
+        'и рассылает сигнал posts_became_visible.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Открыть наступившие публикации и завершить работу.',
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=int,
+            default=MAX_SLEEP,
+            help='Максимальная пауза между проверками, секунд.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(f'Открыто публикаций: {published}')
+            if options['once']:
+                return
+            time.sleep(self.get_sleep(options['max_sleep']))
+
+    def get_sleep(self, max_sleep):
+        # Расписание сбрасывают сигналы в общем кэше, но изменения в обход
+        # ORM (SQL, другой сервер с отдельным кэшем) его не сбросят,
+        # поэтому оно перечитывается не реже чем раз в max_sleep секунд.
+        reset_next_publication()
+        next_publication = get_next_publication()
+        if next_publication is None:
+            return max_sleep
+        seconds = (next_publication - quantized_now()).total_seconds()
+        return min(max_sleep, max(seconds, 0) + 1)
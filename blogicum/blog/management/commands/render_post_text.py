@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_versions, version_name
+from blog.models import Post
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново строит сохранённые начало текста и HTML публикаций, '
+        'например после изменения правил отрисовки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько публикаций обновлять одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        total = 0
+        for post in Post.objects.only('text').iterator(chunk_size=batch_size):
+            post.render_text()
+            batch.append(post)
+            if len(batch) == batch_size:
+                total += self.save(batch)
+        total += self.save(batch)
+        self.stdout.write(f'Обновлено публикаций: {total}')
+
+    def save(self, batch):
+        Post.objects.bulk_update(batch, ('excerpt', 'text_html'))
+        bump_versions(*map(version_name, batch))
+        saved = len(batch)
+        batch.clear()
+        return saved
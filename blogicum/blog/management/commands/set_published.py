@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Category, Location, Post
+from blog.moderation import CHUNK_SIZE, pk_chunks, set_published_chunk
+
+MODELS = {
+    model._meta.model_name: model for model in (Post, Category, Location)
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует или снимает с публикации объекты пачками, '
+        'одним UPDATE и одним сбросом кэшей на пачку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(MODELS))
+        parser.add_argument(
+            'pks',
+            nargs='*',
+            type=int,
+            help='Идентификаторы объектов.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Изменить все объекты модели.',
+        )
+        parser.add_argument(
+            '--unpublish',
+            action='store_true',
+            help='Снять с публикации вместо публикации.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Сколько объектов менять одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['pks'] and not options['all']:
+            raise CommandError('Укажите идентификаторы объектов или --all.')
+        model = MODELS[options['model']]
+        queryset = model.objects.all()
+        if options['pks']:
+            queryset = queryset.filter(pk__in=options['pks'])
+        total = 0
+        for pks in pk_chunks(queryset, options['chunk_size']):
+            total += set_published_chunk(
+                model, pks, not options['unpublish']
+            )
+            self.stdout.write(f'Изменено объектов: {total}')
+        self.stdout.write(f'Готово, изменено объектов: {total}')
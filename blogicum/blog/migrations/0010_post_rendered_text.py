@@ -0,0 +1,41 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:39
+
+from django.db import migrations, models
+
+from blog.rendering import render_excerpt, render_html
+
+
+def backfill_rendered_text(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = []
+    for post in Post.objects.only('text').iterator():
+        post.excerpt = render_excerpt(post.text)
+        post.text_html = render_html(post.text)
+        posts.append(post)
+        if len(posts) == 500:
+            Post.objects.bulk_update(posts, ('excerpt', 'text_html'))
+            posts = []
+    Post.objects.bulk_update(posts, ('excerpt', 'text_html'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=1024, verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(
+            backfill_rendered_text, migrations.RunPython.noop
+        ),
+    ]
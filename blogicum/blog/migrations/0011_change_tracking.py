@@ -0,0 +1,41 @@
+# Generated by Django 3.2.16 on 2026-10-17 12:10
+
+import core.models
+from django.db import migrations, models
+from django.utils import timezone
+
+TRACKED_MODELS = ('category', 'comment', 'location', 'post')
+
+
+def backfill_updated_at(apps, schema_editor):
+    for model_name in TRACKED_MODELS:
+        model = apps.get_model('blog', model_name)
+        model.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_rendered_text'),
+    ]
+
+    operations = [
+        *(
+            migrations.AddField(
+                model_name=model_name,
+                name='updated_at',
+                field=models.DateTimeField(auto_now=True, default=timezone.now, verbose_name='Изменено'),
+                preserve_default=False,
+            )
+            for model_name in TRACKED_MODELS
+        ),
+        *(
+            migrations.AddField(
+                model_name=model_name,
+                name='version',
+                field=models.PositiveBigIntegerField(default=core.models.next_version, editable=False, verbose_name='Версия'),
+            )
+            for model_name in TRACKED_MODELS
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
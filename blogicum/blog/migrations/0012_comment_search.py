@@ -0,0 +1,53 @@
+# Generated by Django 3.2.16 on 2026-10-17 14:05
+
+from django.db import migrations
+
+# Полнотекстовый индекс комментариев для SQLite. Индекс поддерживают
+# триггеры, поэтому он видит и массовые изменения. SQLite пересоздаёт
+# таблицу при изменении её полей и теряет при этом триггеры: после таких
+# миграций blog_comment их нужно создать заново.
+CREATE_SEARCH = (
+    "CREATE VIRTUAL TABLE blog_comment_fts USING fts5("
+    "text, content='blog_comment', content_rowid='id')",
+    "CREATE TRIGGER blog_comment_fts_insert AFTER INSERT ON blog_comment "
+    "BEGIN INSERT INTO blog_comment_fts(rowid, text) "
+    "VALUES (new.id, new.text); END",
+    "CREATE TRIGGER blog_comment_fts_delete AFTER DELETE ON blog_comment "
+    "BEGIN INSERT INTO blog_comment_fts(blog_comment_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER blog_comment_fts_update AFTER UPDATE OF text "
+    "ON blog_comment BEGIN "
+    "INSERT INTO blog_comment_fts(blog_comment_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO blog_comment_fts(rowid, text) VALUES (new.id, new.text); "
+    "END",
+    "INSERT INTO blog_comment_fts(blog_comment_fts) VALUES ('rebuild')",
+)
+DROP_SEARCH = (
+    'DROP TRIGGER IF EXISTS blog_comment_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_update',
+    'DROP TABLE IF EXISTS blog_comment_fts',
+)
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_change_tracking'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SEARCH), run_on_sqlite(DROP_SEARCH)
+        ),
+    ]
@@ -1,37 +1,184 @@
-from django.db.models import Count
+from django.db.models import Q
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
-from django.utils import timezone
 
+from blog.cache import (
+    FEED, FEED_CACHE_MAX_TIMEOUT, card_version, get_cached_page, get_versions,
+    page_cache_key, post_dependencies, set_cached_page
+)
 from blog.forms import CommentForm, PostForm
 from blog.models import Comment, Post
+from blog.paginators import FeedPaginator, InvalidCursor, KeysetPaginator
+from blog.visibility import feed_cache_timeout, publish_due_posts
+from core.routers import reads_primary, replica_lags, replica_reads
 
 VISIBLE_POSTS = 10
+IDENTITY_MAP_ATTR = '_blog_identity_map'
+
+
+def get_object_once(request, queryset):
+    """Единственный объект выборки, загруженный не больше раза за запрос.
+
+    Объекты запоминаются на объекте запроса по тексту SQL, поэтому
+    повторные вызовы с той же выборкой не обращаются к базе.
+    """
+    identity_map = request.__dict__.setdefault(IDENTITY_MAP_ATTR, {})
+    key = (queryset.model._meta.label, str(queryset.query))
+    if key not in identity_map:
+        identity_map[key] = get_object_or_404(queryset)
+    return identity_map[key]
+
+
+class IdentityMapMixin:
+    """get_object через get_object_once."""
+
+    def get_object(self, queryset=None):
+        if queryset is None:
+            queryset = self.get_queryset()
+        return get_object_once(
+            self.request,
+            queryset.filter(pk=self.kwargs.get(self.pk_url_kwarg)),
+        )
+
+
+class AnonymousPageCacheMixin:
+    """Кэширует страницы, отданные анонимным читателям.
+
+    Вместе со страницей сохраняются версии объектов, попавших на неё;
+    страница отдаётся из кэша, только пока ни одна из версий не
+    изменилась. Версии сбрасывают обработчики сигналов моделей, а набор
+    зависимостей страницы возвращает get_cache_dependencies(context).
+    Страница, прочитанная из реплики без последних изменений, не
+    сохраняется: иначе старое содержимое легло бы под новые версии.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request.get_full_path())
+        page = get_cached_page(key)
+        if page is not None:
+            return HttpResponse(
+                page['content'], content_type=page['content_type']
+            )
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'context_data'):
+            versions = get_versions(
+                self.get_cache_dependencies(response.context_data)
+            )
+            if replica_lags(request, max(versions.values())):
+                return response
+            timeout = self.get_cache_timeout()
+            response.add_post_render_callback(
+                lambda rendered: set_cached_page(
+                    key,
+                    {
+                        'content': rendered.content,
+                        'content_type': rendered['Content-Type'],
+                    },
+                    versions,
+                    timeout,
+                )
+            )
+        return response
+
+    def get_cache_timeout(self):
+        return feed_cache_timeout()
+
+
+class ReplicaReadMixin:
+    """Читает страницу из реплики, если пользователь недавно не писал."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or reads_primary(request):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            # Шаблон отрисовывается здесь, чтобы и его запросы шли в реплику.
+            if hasattr(response, 'render'):
+                response.render()
+        return response
 
 
 class PostAddition:
     paginate_by = VISIBLE_POSTS
+    paginator_class = FeedPaginator
+    keyset_pagination = False
 
     def filter_method(self, query):
-        return query.annotate(
-            comment_count=Count('comments')
-        ).select_related(
+        return query.select_related(
             'category', 'location', 'author'
-        ).order_by('-pub_date')
+        ).defer('text', 'text_html').order_by('-pub_date', '-pk')
 
     def get_queryset(self):
-        return self.filter_method(
-            Post.objects.filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=timezone.now()
+        publish_due_posts()
+        return self.filter_method(Post.objects.visible())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        posts = context['page_obj']
+        versions = get_versions(
+            set().union(*(post_dependencies(post) for post in posts))
+        )
+        for post in posts:
+            post.card_version = card_version(post, versions)
+            # Карточку из отстающей реплики не кэшируем под новой версией.
+            if replica_lags(self.request, max(
+                versions[name] for name in post_dependencies(post)
+            )):
+                post.card_version = None
+        context['post_card_timeout'] = FEED_CACHE_MAX_TIMEOUT
+        return context
+
+    def get_cache_dependencies(self, context):
+        return {FEED}.union(
+            *(post_dependencies(post) for post in context['page_obj'])
+        )
+
+    def get_feed_key(self):
+        return ':'.join((
+            self.request.resolver_match.view_name,
+            *map(str, self.kwargs.values()),
+        ))
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, cache_key=self.get_feed_key(), **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
             )
+        except InvalidCursor:
+            raise Http404
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class VisiblePostMixin:
+    """Публикации, доступные пользователю: видимые всем и свои."""
+
+    def get_queryset(self):
+        publish_due_posts()
+        queryset = Post.objects.select_related(
+            'author', 'category', 'location'
         )
+        if self.request.user.is_authenticated:
+            return queryset.filter(
+                Q(is_visible=True) | Q(author=self.request.user)
+            )
+        return queryset.visible()
 
 
-class PostDispMixin:
+class PostDispMixin(IdentityMapMixin):
     def dispatch(self, request, *args, **kwargs):
-        if request.user != self.get_object().author:
+        if request.user.pk != self.get_object().author_id:
             return redirect(
                 'blog:post_detail',
                 post_id=self.kwargs['post_id']
@@ -52,10 +199,12 @@ class CommentMixin:
     template_name = 'blog/comment.html'
 
     def get_object(self):
-        return get_object_or_404(
-            Comment,
-            pk=self.kwargs['comment_id'],
-            author=self.request.user
+        return get_object_once(
+            self.request,
+            Comment.objects.filter(
+                pk=self.kwargs['comment_id'],
+                author=self.request.user
+            ),
         )
 
     def get_success_url(self):
@@ -1,12 +1,28 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
 from django.urls import reverse
+from django.utils import timezone
 
-from core.models import PublishedModel
+from blog.cache import touch_tables
+from blog.rendering import EXCERPT_MAX_LENGTH, render_excerpt, render_html
+from core.models import (
+    ChangeTrackedModel, ChangeTrackedQuerySet, PublishedModel
+)
 
 User = get_user_model()
 
 SYMBOL_LIMIT = 30
+COMMENT_SEARCH_TABLE = 'blog_comment_fts'
+# Поля публикации, которые обработчики pre_save вычисляют из других полей.
+POST_DERIVED_FIELDS = {
+    'is_visible': {'is_published', 'pub_date', 'category', 'category_id'},
+    'excerpt': {'text'},
+    'text_html': {'text'},
+}
 
 
 class Category(PublishedModel):
@@ -38,6 +54,65 @@ class Location(PublishedModel):
         return self.name[:SYMBOL_LIMIT]
 
 
+# Публикации, удаляемые в текущем Post.delete или PostQuerySet.delete.
+_deleting_posts = ContextVar('deleting_posts', default=None)
+
+
+@contextmanager
+def post_deletion():
+    """Область удаления публикаций, которая снимается и при ошибке."""
+    token = _deleting_posts.set(set())
+    try:
+        yield
+    finally:
+        _deleting_posts.reset(token)
+
+
+def mark_post_deleting(pk):
+    posts = _deleting_posts.get()
+    if posts is not None:
+        posts.add(pk)
+
+
+def is_post_deleting(pk):
+    """Удаляется ли публикация в текущей области post_deletion."""
+    posts = _deleting_posts.get()
+    return posts is not None and pk in posts
+
+
+class PostQuerySet(ChangeTrackedQuerySet):
+
+    def delete(self):
+        with post_deletion():
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def update(self, **kwargs):
+        updated = super().update(**kwargs)
+        if updated:
+            touch_tables(self.model._meta.model_name)
+        return updated
+
+    def visible(self):
+        return self.filter(is_visible=True)
+
+    def refresh_visibility(self, now=None):
+        """Пересчитывает is_visible набором из двух UPDATE."""
+        rule = models.Q(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=now or timezone.now(),
+        )
+        return (
+            self.filter(rule, is_visible=False).update(is_visible=True)
+            + self.filter(is_visible=True).exclude(rule).update(
+                is_visible=False
+            )
+        )
+
+
 class Post(PublishedModel):
     title = models.CharField('Заголовок', max_length=256)
     text = models.TextField('Текст')
@@ -69,11 +144,55 @@ class Post(PublishedModel):
         upload_to='blog_images',
         blank=True
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    excerpt = models.CharField(
+        'Начало текста',
+        max_length=EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False,
+    )
+    text_html = models.TextField(
+        'Текст в HTML',
+        blank=True,
+        editable=False,
+    )
+    is_visible = models.BooleanField(
+        'Видна в лентах',
+        default=False,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         default_related_name = 'posts'
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                name='post_feed_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            models.Index(
+                fields=('pub_date',),
+                name='post_scheduled_idx',
+                condition=models.Q(is_published=True, is_visible=False),
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.title[:SYMBOL_LIMIT]
@@ -81,8 +200,62 @@ class Post(PublishedModel):
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            update_fields |= {
+                derived for derived, sources in POST_DERIVED_FIELDS.items()
+                if update_fields & sources
+            }
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with post_deletion():
+            return super().delete(*args, **kwargs)
 
-class Comment(models.Model):
+    def render_text(self):
+        self.excerpt = render_excerpt(self.text)
+        self.text_html = render_html(self.text)
+
+    def compute_visibility(self, now=None):
+        return bool(
+            self.is_published
+            and self.category_id
+            and self.category.is_published
+            and self.pub_date <= (now or timezone.now())
+        )
+
+
+class CommentQuerySet(ChangeTrackedQuerySet):
+
+    def search(self, search_term):
+        """Комментарии с указанными словами в тексте или от автора.
+
+        В SQLite текст ищется по полнотекстовому индексу FTS5 (миграция
+        0012), слова понимаются как начала слов. Автор ищется по точному
+        имени пользователя.
+        """
+        terms = search_term.split()
+        by_author = models.Q(author__username=search_term.strip())
+        if connection.vendor != 'sqlite':
+            by_text = models.Q()
+            for term in terms:
+                by_text &= models.Q(text__icontains=term)
+            return self.filter(by_text | by_author)
+        match = ' '.join(
+            '"{}"*'.format(term.replace('"', '""')) for term in terms
+        )
+        return self.filter(
+            models.Q(pk__in=RawSQL(
+                f'SELECT rowid FROM {COMMENT_SEARCH_TABLE} '
+                f'WHERE {COMMENT_SEARCH_TABLE} MATCH %s',
+                (match,),
+            ))
+            | by_author
+        )
+
+
+class Comment(ChangeTrackedModel):
     text = models.TextField('Текст комментария')
     post = models.ForeignKey(
         Post,
@@ -92,11 +265,19 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self) -> str:
-        return (f'Комментарий автора {self.post.author.username}'
-                'к посту {self.post.title}, текст: {self.text}')
+        return (f'Комментарий {self.pk} к публикации {self.post_id}: '
+                f'{self.text[:SYMBOL_LIMIT]}')
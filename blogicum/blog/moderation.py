@@ -0,0 +1,95 @@
+import logging
+import threading
+
+from django.db import connections
+
+from blog.cache import FEED, bump_versions, touch_tables
+from blog.models import Category, Post
+from blog.visibility import reset_next_publication
+from core.metrics import MODEL_WRITES
+
+CHUNK_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def pk_chunks(queryset, chunk_size=CHUNK_SIZE):
+    """Первичные ключи выборки пачками по возрастанию, без OFFSET."""
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk
+        )
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+def set_published_chunk(model, pks, is_published):
+    """Меняет is_published пачки объектов одним UPDATE.
+
+    Видимость публикаций пересчитывается, а кэши сбрасываются один раз
+    на пачку, а не на каждую строку.
+    """
+    if not pks:
+        return 0
+    updated = model.objects.filter(pk__in=pks).update(
+        is_published=is_published
+    )
+    if model is Post:
+        Post.objects.filter(pk__in=pks).refresh_visibility()
+    elif model is Category:
+        Post.objects.filter(category__in=pks).refresh_visibility()
+    model_name = model._meta.model_name
+    names = [f'{model_name}:{pk}' for pk in pks]
+    if model in (Post, Category):
+        names.append(FEED)
+        reset_next_publication()
+    bump_versions(*names)
+    touch_tables(model_name)
+    MODEL_WRITES.inc(updated, model=model_name, action='update')
+    return updated
+
+
+def set_published(model, chunks, is_published):
+    """Меняет is_published по пачкам.
+
+    При ошибке в журнал пишется последний обработанный pk, чтобы
+    продолжить с него командой set_published.
+    """
+    updated = 0
+    last_pk = None
+    try:
+        for pks in chunks:
+            updated += set_published_chunk(model, pks, is_published)
+            if pks:
+                last_pk = pks[-1]
+    except Exception:
+        logger.error(
+            'Изменение is_published у %s прервано: обработаны объекты '
+            'до pk=%s, изменено %s.',
+            model._meta.label, last_pk, updated,
+        )
+        raise
+    return updated
+
+
+def start_in_background(target, *args):
+    """Запускает target в отдельном потоке со своим соединением с базой.
+
+    Ошибка target пишется в журнал: администратор уже получил ответ.
+    """
+    def run():
+        try:
+            target(*args)
+        except Exception:
+            logger.exception('Фоновая задача %s не выполнена', target.__name__)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,170 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
+from django.utils.encoding import force_str
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from blog.cache import feed_count_key
+from blog.visibility import feed_cache_timeout
+
+# Наибольший id, который SQLite хранит в INTEGER.
+MAX_PK = 2 ** 63 - 1
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(obj, field='pub_date'):
+    value = f'{getattr(obj, field).isoformat()}|{obj.pk}'
+    return urlsafe_base64_encode(value.encode())
+
+
+def decode_cursor(cursor):
+    """Дата и id из курсора; InvalidCursor, если их нельзя сравнить с базой."""
+    try:
+        value, pk = force_str(urlsafe_base64_decode(cursor)).split('|')
+        value, pk = datetime.fromisoformat(value), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+    if value.tzinfo is None or not 1 <= pk <= MAX_PK:
+        raise InvalidCursor(cursor)
+    return value, pk
+
+
+class KeysetPage(Sequence):
+    """Страница, выбранная по ключу (поле даты, id) без OFFSET."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor(self.object_list[-1], self.paginator.field)
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor(self.object_list[0], self.paginator.field)
+
+
+class KeysetPaginator:
+    """Курсорная пагинация по ключу (field, id).
+
+    По умолчанию лента идёт по убыванию pub_date. Каждая страница
+    читается одним запросом с LIMIT per_page + 1, поэтому её стоимость
+    не зависит от глубины.
+    """
+
+    is_keyset = True
+
+    def __init__(self, queryset, per_page, field='pub_date', descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+        self.descending = descending
+
+    def _seek(self, cursor, forward):
+        value, pk = decode_cursor(cursor)
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return self.queryset.filter(
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _ordering(self, forward):
+        prefix = '-' if forward == self.descending else ''
+        return f'{prefix}{self.field}', f'{prefix}pk'
+
+    def page(self, after=None, before=None):
+        if before:
+            rows = list(
+                self._seek(before, forward=False).order_by(
+                    *self._ordering(forward=False)
+                )[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            object_list = rows[:self.per_page][::-1]
+            return KeysetPage(object_list, self, True, has_previous)
+        queryset = self._seek(after, forward=True) if after else self.queryset
+        queryset = queryset.order_by(*self._ordering(forward=True))
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page], self, len(rows) > self.per_page, bool(after)
+        )
+
+
+class FeedPaginator(Paginator):
+    """Постраничная пагинация с кэшированным числом публикаций.
+
+    Счётчик хранится в кэше под версией ленты, которую сбрасывают
+    изменения публикаций и категорий, а шаблону отдаётся окно страниц
+    фиксированной ширины.
+    """
+
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, *args, cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        key = feed_count_key(self.cache_key)
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, feed_cache_timeout())
+        return count
+
+    def page(self, number):
+        page = super().page(number)
+        page.elided_page_range = list(self.get_elided_page_range(
+            page.number, on_each_side=self.on_each_side, on_ends=self.on_ends
+        ))
+        return page
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который не считает всю таблицу через COUNT(*).
+
+    Для выборки без условий число строк оценивается по наибольшему
+    первичному ключу: это одно чтение индекса. Удалённые строки дают
+    лишь пустые последние страницы.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+        estimate = self.object_list.model._default_manager.aggregate(
+            max_pk=Max('pk')
+        )['max_pk']
+        return estimate or 0
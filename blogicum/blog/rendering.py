@@ -0,0 +1,16 @@
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 1024
+
+
+def render_excerpt(text):
+    """То же, что фильтр truncatewords:10 в карточке публикации."""
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    return Truncator(excerpt).chars(EXCERPT_MAX_LENGTH)
+
+
+def render_html(text):
+    """То же, что фильтр linebreaksbr с экранированием."""
+    return linebreaksbr(text, autoescape=True)
@@ -0,0 +1,106 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from blog.cache import FEED, bump_versions, touch_tables, version_name
+from blog.models import (
+    Category, Comment, Location, Post, User, is_post_deleting,
+    mark_post_deleting
+)
+from blog.visibility import reset_next_publication
+from core.metrics import MODEL_WRITES
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleting_post(sender, instance, **kwargs):
+    # Счётчик удаляемой публикации не нужен, и каскад не должен делать
+    # UPDATE на каждый её комментарий.
+    mark_post_deleting(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if is_post_deleting(instance.post_id):
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_feeds(sender, instance, **kwargs):
+    bump_versions(FEED, version_name(instance))
+    touch_tables(sender._meta.model_name)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+def invalidate_object(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_versions(version_name(instance))
+    touch_tables(sender._meta.model_name)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    bump_versions(f'post:{instance.post_id}')
+    touch_tables(sender._meta.model_name)
+
+
+@receiver(pre_save, sender=Post)
+def set_post_visibility(sender, instance, **kwargs):
+    instance.is_visible = instance.compute_visibility()
+
+
+@receiver(pre_save, sender=Post)
+def render_post_text(sender, instance, **kwargs):
+    instance.render_text()
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_visibility(sender, instance, **kwargs):
+    instance.posts.refresh_visibility()
+
+
+@receiver(post_delete, sender=Category)
+def hide_orphaned_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=None).refresh_visibility()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_publication_schedule(sender, **kwargs):
+    reset_next_publication()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_write(sender, created, **kwargs):
+    MODEL_WRITES.inc(
+        model=sender._meta.model_name,
+        action='create' if created else 'update',
+    )
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def count_delete(sender, **kwargs):
+    MODEL_WRITES.inc(model=sender._meta.model_name, action='delete')
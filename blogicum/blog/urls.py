@@ -30,6 +30,16 @@ posts_urls = [
         views.CommentCreateView.as_view(),
         name='add_comment'
     ),
+    path(
+        '<int:post_id>/comments/',
+        views.CommentListView.as_view(),
+        name='comments'
+    ),
+    path(
+        '<int:post_id>/comments/live/',
+        views.live_comments,
+        name='live_comments'
+    ),
     path(
         '<int:post_id>/edit_comment/<int:comment_id>/',
         views.CommentUpdateView.as_view(),
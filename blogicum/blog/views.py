@@ -1,19 +1,81 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, ListView, UpdateView
+    CreateView, DeleteView, DetailView, ListView, UpdateView, View
 )
 
+from blog.cache import (
+    FEED_ETAG_DEPENDENCIES, FEED_TABLES, POST_ETAG_DEPENDENCIES,
+    get_last_modified, get_versions, make_etag, post_dependencies,
+    version_name
+)
 from blog.forms import CommentForm, UserForm
-from blog.mixins import CommentMixin, PostAddition, PostDispMixin, PostMixin
+from blog.live import publish_comment
+from blog.mixins import (
+    AnonymousPageCacheMixin, CommentMixin, PostAddition, PostDispMixin,
+    PostMixin, ReplicaReadMixin, VisiblePostMixin, get_object_once
+)
 from blog.models import Category, Comment, Post, User
+from blog.paginators import InvalidCursor, KeysetPaginator
+from blog.visibility import publish_due_posts
+from core.routers import replica_lags
+
+VISIBLE_COMMENTS = 20
+
+
+def versions_etag(request, names):
+    """Значение ETag по версиям.
+
+    None, если страница придёт из реплики без последних изменений.
+    """
+    versions = get_versions(names)
+    if replica_lags(request, max(versions.values())):
+        return None
+    return make_etag(request, versions)
+
+
+def feed_etag(request, *args, **kwargs):
+    publish_due_posts()
+    return versions_etag(request, FEED_ETAG_DEPENDENCIES)
+
+
+def post_etag(request, post_id):
+    publish_due_posts()
+    return versions_etag(
+        request, (f'post:{post_id}', *POST_ETAG_DEPENDENCIES)
+    )
 
 
-class PostListView(PostAddition, ListView):
+def feed_last_modified(request, *args, **kwargs):
+    last_modified = get_last_modified(FEED_TABLES)
+    if replica_lags(request, int(last_modified.timestamp() * 10 ** 9)):
+        return None
+    return last_modified
+
+
+def get_comments_page(post, after=None):
+    return KeysetPaginator(
+        post.comments.select_related('author'),
+        VISIBLE_COMMENTS,
+        field='created_at',
+        descending=False,
+    ).page(after=after)
+
+
+@method_decorator(condition(
+    etag_func=feed_etag, last_modified_func=feed_last_modified
+), name='dispatch')
+class PostListView(
+    AnonymousPageCacheMixin, ReplicaReadMixin, PostAddition, ListView
+):
     template_name = 'blog/index.html'
+    keyset_pagination = True
 
 
 class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
@@ -38,73 +100,101 @@ class PostDeleteView(LoginRequiredMixin, PostMixin, PostDispMixin, DeleteView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = CommentForm(instance=self.get_object())
+        context['form'] = CommentForm(instance=self.object)
         return context
 
 
-class PostDetailView(PostMixin, DetailView):
+@method_decorator(condition(
+    etag_func=post_etag, last_modified_func=feed_last_modified
+), name='dispatch')
+class PostDetailView(
+    AnonymousPageCacheMixin, ReplicaReadMixin, VisiblePostMixin, PostMixin,
+    DetailView
+):
     template_name = 'blog/detail.html'
 
-    def get_object(self):
-        obj = super().get_object()
-        if (self.request.user != obj.author) and (
-            (not obj.is_published)
-            or (not obj.category.is_published)
-            or (obj.pub_date > timezone.now())
-        ):
-            raise Http404
-        return obj
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related(
-            'author'
-        )
+        context['comments_page'] = get_comments_page(self.object)
+        context['comments'] = context['comments_page'].object_list
         return context
 
+    def get_cache_dependencies(self, context):
+        return post_dependencies(context['post']).union(
+            f'user:{comment.author_id}' for comment in context['comments']
+        )
+
 
-class CategoryListView(PostAddition, ListView):
+@method_decorator(condition(
+    etag_func=feed_etag, last_modified_func=feed_last_modified
+), name='dispatch')
+class CategoryListView(
+    AnonymousPageCacheMixin, ReplicaReadMixin, PostAddition, ListView
+):
     template_name = 'blog/category.html'
+    keyset_pagination = True
 
-    def get_queryset(self):
-        _category = get_object_or_404(
+    def get_category(self):
+        return get_object_once(
+            self.request,
             Category.objects.filter(
                 slug=self.kwargs['category_slug'], is_published=True
-            )
+            ),
         )
-        return super().get_queryset().filter(category=_category)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(category=self.get_category())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True,
-        )
+        context['category'] = self.get_category()
         return context
 
+    def get_cache_dependencies(self, context):
+        dependencies = super().get_cache_dependencies(context)
+        return dependencies | {version_name(context['category'])}
+
 
-class ProfileUser(PostAddition, ListView):
+@method_decorator(condition(
+    etag_func=feed_etag, last_modified_func=feed_last_modified
+), name='dispatch')
+class ProfileUser(
+    AnonymousPageCacheMixin, ReplicaReadMixin, PostAddition, ListView
+):
     model = Post
     template_name = 'blog/profile.html'
+    keyset_pagination = True
+
+    def get_profile(self):
+        if self.request.user.username == self.kwargs['username']:
+            return self.request.user
+        return get_object_once(
+            self.request,
+            User.objects.filter(username=self.kwargs['username']),
+        )
 
     def get_queryset(self):
-        _user = get_object_or_404(
-            User.objects.filter(username=self.kwargs['username'])
-        )
+        _user = self.get_profile()
         if _user == self.request.user:
             return self.filter_method(_user.posts.all())
         return super().get_queryset().filter(author=_user)
 
+    def get_feed_key(self):
+        key = super().get_feed_key()
+        if self.request.user.username == self.kwargs['username']:
+            return f'{key}:owner'
+        return key
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User,
-            username=self.kwargs['username']
-        )
+        context['profile'] = self.get_profile()
         return context
 
+    def get_cache_dependencies(self, context):
+        dependencies = super().get_cache_dependencies(context)
+        return dependencies | {version_name(context['profile'])}
+
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
@@ -136,7 +226,44 @@ class CommentCreateView(LoginRequiredMixin, CommentMixin, CreateView):
             Post,
             pk=self.kwargs['post_id'],
         )
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        transaction.on_commit(lambda: publish_comment(self.object))
+        return response
+
+
+def live_comments(request, post_id):
+    """Поток новых комментариев обслуживает blog.live под ASGI.
+
+    Без ASGI соединение не удерживается: ответ 204 просит EventSource
+    больше не переподключаться.
+    """
+    return HttpResponse(status=204)
+
+
+class CommentListView(VisiblePostMixin, View):
+    """Следующая страница комментариев: HTML-фрагмент или JSON."""
+
+    template_name = 'includes/comment_list.html'
+
+    def get(self, request, *args, **kwargs):
+        post = get_object_or_404(self.get_queryset(), pk=kwargs['post_id'])
+        try:
+            page = get_comments_page(post, after=request.GET.get('after'))
+        except InvalidCursor:
+            raise Http404
+        context = {
+            'post': post,
+            'comments': page.object_list,
+            'comments_page': page,
+        }
+        if 'application/json' in request.headers.get('Accept', ''):
+            return JsonResponse({
+                'html': render_to_string(
+                    self.template_name, context, request=request
+                ),
+                'next_cursor': page.next_cursor,
+            })
+        return render(request, self.template_name, context)
 
 
 class CommentUpdateView(LoginRequiredMixin, CommentMixin, UpdateView):
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.db import router
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog.cache import FEED, FEED_CACHE_MAX_TIMEOUT, bump_versions
+from blog.models import Post
+
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+NO_SCHEDULED_POSTS = 'none'
+
+posts_became_visible = Signal()
+
+
+def primary_posts():
+    """Публикации из основной базы: расписание читается там же, где пишется."""
+    return Post.objects.using(router.db_for_write(Post))
+
+
+def quantized_now():
+    """Текущее время с точностью до секунды.
+
+    Одинаковые запросы в пределах секунды получают одинаковые параметры
+    и могут обслуживаться из кэша.
+    """
+    return timezone.now().replace(microsecond=0)
+
+
+def get_next_publication():
+    """Ближайшая отложенная публикация, которая ещё не видна в лентах."""
+    next_publication = cache.get(NEXT_PUBLICATION_KEY)
+    if next_publication is None:
+        next_publication = primary_posts().filter(
+            is_published=True,
+            category__is_published=True,
+            is_visible=False,
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
+        cache.set(
+            NEXT_PUBLICATION_KEY, next_publication or NO_SCHEDULED_POSTS, None
+        )
+    if next_publication == NO_SCHEDULED_POSTS:
+        return None
+    return next_publication
+
+
+def reset_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def feed_cache_timeout(now=None):
+    """Сколько секунд ленты гарантированно не изменятся сами по себе."""
+    next_publication = get_next_publication()
+    if next_publication is None:
+        return FEED_CACHE_MAX_TIMEOUT
+    seconds = (next_publication - (now or quantized_now())).total_seconds()
+    return max(1, min(FEED_CACHE_MAX_TIMEOUT, int(seconds)))
+
+
+def publish_due_posts(now=None):
+    """Открывает отложенные публикации, время которых уже наступило.
+
+    Пока ближайшая публикация в будущем, обходится одним чтением кэша.
+    Открытые публикации рассылаются сигналом posts_became_visible.
+    """
+    now = now or quantized_now()
+    next_publication = get_next_publication()
+    if next_publication is None or next_publication > now:
+        return 0
+    due = primary_posts().filter(
+        is_published=True,
+        category__is_published=True,
+        is_visible=False,
+        pub_date__lte=now,
+    )
+    post_ids = list(due.values_list('pk', flat=True))
+    primary_posts().filter(pk__in=post_ids).update(is_visible=True)
+    reset_next_publication()
+    if post_ids:
+        bump_versions(FEED)
+        posts_became_visible.send(sender=Post, post_ids=post_ids)
+    return len(post_ids)
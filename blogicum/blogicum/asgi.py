@@ -4,4 +4,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Модели можно импортировать только после настройки Django.
+from blog.live import LiveCommentsMiddleware  # noqa: E402
+
+application = LiveCommentsMiddleware(django_application)
@@ -29,15 +29,67 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'core.routers.ReadYourWritesMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if DEBUG:
+    MIDDLEWARE.append('core.budgets.QueryBudgetMiddleware')
+
+# Наибольшее число запросов к базе на запрос по имени URL
+# (core.budgets), с учётом сессии и пользователя. Превышение
+# означает новый ленивый доступ к связанным объектам.
+QUERY_BUDGETS = {
+    'blog:index': 4,
+    'blog:post_detail': 5,
+    'blog:category_posts': 5,
+    'blog:profile': 5,
+    'blog:comments': 5,
+    'blog:create_post': 6,
+    'blog:edit_post': 6,
+    'blog:delete_post': 6,
+    'blog:add_comment': 6,
+    'blog:edit_comment': 4,
+    'blog:delete_comment': 5,
+    'blog:edit_profile': 4,
+    'pages:about': 2,
+    'pages:rules': 2,
+}
+
+# Поднимать исключение при превышении бюджета вместо записи в журнал.
+QUERY_BUDGET_RAISE = False
+
+# Журнал JSONL с измерениями каждого запроса (core.perflog), например
+# BASE_DIR / 'logs' / 'requests.jsonl'. None отключает журнал. Записи
+# копятся в памяти и дописываются фоновым потоком пачками; пока файл
+# недоступен, в памяти хранится не больше PERF_LOG_MAX_BUFFER_SIZE.
+PERF_LOG_PATH = None
+PERF_LOG_BUFFER_SIZE = 100
+PERF_LOG_FLUSH_INTERVAL = 5
+PERF_LOG_MAX_BUFFER_SIZE = 10000
+
+# Заголовок Server-Timing с временем базы, кэша, шаблонов и остального
+# кода (core.instrumentation) для представлений из этих пространств имён.
+SERVER_TIMING = True
+SERVER_TIMING_NAMESPACES = ('blog', 'pages')
+
+# Каталог файлов метрик (core.metrics): у каждого процесса свой файл,
+# /metrics суммирует все. Очищайте каталог при перезапуске сервера.
+# None отключает метрики.
+METRICS_DIR = BASE_DIR / 'logs' / 'metrics'
+
+# Адреса, с которых /metrics доступна без входа (обычно сборщик метрик).
+# За обратным прокси REMOTE_ADDR — адрес прокси, поэтому список нужно
+# сузить или закрыть /metrics на самом прокси.
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -46,7 +98,7 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.instrumentation.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -63,13 +115,68 @@ TEMPLATES = [
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
+# Выполняются на каждом новом соединении с SQLite (core.db).
+# WAL позволяет читать во время записи, а busy_timeout заставляет
+# ждать блокировку вместо ошибки «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            # Размер кэша подготовленных выражений модуля sqlite3.
+            'cached_statements': 256,
+        },
+    },
+    # Копия основной базы только для чтения, её обновляет команда
+    # refresh_replicas. Используется, только если указана в READ_REPLICAS.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'OPTIONS': {
+            'cached_statements': 256,
+        },
+        # Реплику подменяют целиком, поэтому журнал у неё обычный, без WAL.
+        'PRAGMAS': {
+            name: value for name, value in SQLITE_PRAGMAS.items()
+            if name != 'journal_mode'
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+# Кэш общий для всех процессов сервера: от версий в нём зависят кэш
+# страниц, ETag и расписание публикаций, и изменение в одном воркере
+# должно быть видно остальным. Для нескольких серверов нужен memcached
+# или redis с той же обёрткой InstrumentedCacheMixin (core.instrumentation).
+CACHES = {
+    'default': {
+        'BACKEND': 'core.instrumentation.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Базы, из которых читают ленты и страница публикации.
+READ_REPLICAS = []
+
+# Сколько секунд после записи пользователь читает из основной базы.
+READ_YOUR_WRITES_SECONDS = 10
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
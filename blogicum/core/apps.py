@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core.db import configure_sqlite_connection
+        from core.instrumentation import add_server_timing, request_measured
+        from core.metrics import install_lock_counter, record_request
+        from core.perflog import log_request
+
+        connection_created.connect(configure_sqlite_connection)
+        connection_created.connect(install_lock_counter)
+        request_measured.connect(log_request)
+        request_measured.connect(add_server_timing)
+        request_measured.connect(record_request)
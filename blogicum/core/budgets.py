@@ -0,0 +1,81 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper, которая запоминает выполненный SQL.
+
+    Заодно считает общее время запросов и самый медленный из них.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.time = 0.0
+        self.slowest = (0.0, None)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.time += duration
+            if duration >= self.slowest[0]:
+                self.slowest = (duration, sql)
+
+
+def count_queries():
+    """Контекст, считающий запросы ко всем базам."""
+    counter = QueryCounter()
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(counter))
+    return stack, counter
+
+
+def check_budget(url_name, queries):
+    """Сверяет число запросов с QUERY_BUDGETS[url_name].
+
+    Превышение пишется в журнал, а при QUERY_BUDGET_RAISE поднимает
+    QueryBudgetExceeded.
+    """
+    budget = settings.QUERY_BUDGETS.get(url_name)
+    if budget is None or len(queries) <= budget:
+        return
+    message = (
+        f'{url_name}: {len(queries)} запросов при бюджете {budget}\n'
+        + '\n'.join(queries)
+    )
+    if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryBudgetMiddleware:
+    """Проверяет бюджет запросов к базе для каждого имени URL.
+
+    Для разработки: считаются все запросы, включая отрисовку шаблона.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stack, counter = count_queries()
+        with stack:
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match is not None:
+            check_budget(match.view_name, counter.queries)
+        return response
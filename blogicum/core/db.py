@@ -0,0 +1,39 @@
+from django.conf import settings
+
+SQLITE_PRAGMA_NAMES = frozenset((
+    'busy_timeout',
+    'cache_size',
+    'journal_mode',
+    'mmap_size',
+    'synchronous',
+    'temp_store',
+))
+
+
+def apply_sqlite_pragmas(cursor, pragmas):
+    """Выполняет PRAGMA из словаря {имя: значение} на курсоре SQLite."""
+    for name, value in pragmas.items():
+        if name not in SQLITE_PRAGMA_NAMES:
+            raise ValueError(f'Неизвестная PRAGMA SQLite: {name}')
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite.
+
+    PRAGMA берутся из ключа PRAGMAS настроек базы, а без него — из
+    SQLITE_PRAGMAS. Они выполняются на соединении модуля sqlite3 в обход
+    execute_wrapper, чтобы не попадать в счётчики запросов: при
+    CONN_MAX_AGE = 0 соединение открывается заново в каждом запросе.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get(
+        'PRAGMAS', getattr(settings, 'SQLITE_PRAGMAS', {})
+    )
+    if pragmas:
+        cursor = connection.connection.cursor()
+        try:
+            apply_sqlite_pragmas(cursor, pragmas)
+        finally:
+            cursor.close()
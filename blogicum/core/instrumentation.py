@@ -0,0 +1,193 @@
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache.backends import filebased, locmem
+from django.dispatch import Signal
+from django.template.backends import django as django_backend
+
+from core.budgets import count_queries
+
+_current_stats = ContextVar('request_stats', default=None)
+_MISSING = object()
+
+# Отправляется после каждого запроса с аргументами request, response
+# и stats (RequestStats). Получатели пишут журнал, заголовки и метрики.
+request_measured = Signal()
+
+
+class RequestStats:
+    """Измерения одного запроса: база, кэш, шаблоны и общее время."""
+
+    def __init__(self, queries):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = queries
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+
+    @property
+    def view_time(self):
+        """Время остального кода: без базы, кэша и шаблонов."""
+        return max(0.0, self.duration - self.queries.time - self.cache_time
+                   - self.template_time)
+
+
+def current_stats():
+    """Измерения текущего запроса или None вне запроса."""
+    return _current_stats.get()
+
+
+def _timed_cache_operation(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.cache_time += time.perf_counter() - started
+    return wrapper
+
+
+class InstrumentedCacheMixin:
+    """Считает попадания и промахи кэша и время обращений к нему.
+
+    Групповые операции базового класса сводятся к get, set, add
+    и delete, поэтому учитываются поштучно.
+    """
+
+    @_timed_cache_operation
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        stats = _current_stats.get()
+        if stats is not None:
+            if value is _MISSING:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        return default if value is _MISSING else value
+
+    @_timed_cache_operation
+    def set(self, *args, **kwargs):
+        return super().set(*args, **kwargs)
+
+    @_timed_cache_operation
+    def add(self, *args, **kwargs):
+        return super().add(*args, **kwargs)
+
+    @_timed_cache_operation
+    def incr(self, *args, **kwargs):
+        return super().incr(*args, **kwargs)
+
+    @_timed_cache_operation
+    def delete(self, *args, **kwargs):
+        return super().delete(*args, **kwargs)
+
+
+class FileBasedCache(InstrumentedCacheMixin, filebased.FileBasedCache):
+    pass
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    pass
+
+
+class InstrumentedTemplate(django_backend.Template):
+
+    def render(self, context=None, request=None):
+        stats = _current_stats.get()
+        if stats is None or stats.rendering:
+            return super().render(context, request)
+        stats.rendering = True
+        started = time.perf_counter()
+        nested = stats.queries.time + stats.cache_time
+        try:
+            return super().render(context, request)
+        finally:
+            nested = stats.queries.time + stats.cache_time - nested
+            stats.template_time += time.perf_counter() - started - nested
+            stats.rendering = False
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Шаблонизатор Django, который измеряет время отрисовки.
+
+    Запросы к базе и кэшу во время отрисовки в него не входят, а
+    вложенная отрисовка, например render_to_string из тега, не
+    учитывается второй раз.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(
+            self.engine.from_string(template_code), self
+        )
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+class RequestStatsMiddleware:
+    """Измеряет запрос и отправляет request_measured.
+
+    Стоит первым в MIDDLEWARE, чтобы учитывать запросы сессии
+    и пользователя. Измерения доступны как request.stats.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stack, queries = count_queries()
+        request.stats = stats = RequestStats(queries)
+        token = _current_stats.set(stats)
+        try:
+            with stack:
+                response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        stats.duration = time.perf_counter() - stats.started
+        request_measured.send(
+            sender=self.__class__,
+            request=request,
+            response=response,
+            stats=stats,
+        )
+        return response
+
+
+def format_server_timing(stats):
+    metrics = (
+        ('db', stats.queries.time, f'{len(stats.queries.queries)} queries'),
+        ('cache', stats.cache_time,
+         f'{stats.cache_hits} hits / {stats.cache_misses} misses'),
+        ('template', stats.template_time, None),
+        ('view', stats.view_time, None),
+        ('total', stats.duration, None),
+    )
+    return ', '.join(
+        f'{name};dur={duration * 1000:.1f}'
+        + (f';desc="{description}"' if description else '')
+        for name, duration, description in metrics
+    )
+
+
+def add_server_timing(sender, request, response, stats, **kwargs):
+    """Получатель request_measured: заголовок Server-Timing.
+
+    Добавляется при SERVER_TIMING к ответам представлений из
+    пространств имён SERVER_TIMING_NAMESPACES.
+    """
+    match = request.resolver_match
+    if (
+        settings.SERVER_TIMING
+        and match is not None
+        and match.namespace in settings.SERVER_TIMING_NAMESPACES
+    ):
+        response['Server-Timing'] = format_server_timing(stats)
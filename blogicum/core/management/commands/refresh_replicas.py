@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import set_replica_snapshot
+
+INTERVAL = 30
+# Версии кэша сдвигаются до фиксации транзакции, поэтому отметка копии
+# берётся с запасом на транзакции, ещё не зафиксированные к её началу.
+COMMIT_MARGIN_NS = 5 * 10 ** 9
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет реплики SQLite из READ_REPLICAS копией основной базы '
+        'через backup API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help=(
+                'Повторять копирование раз в столько секунд; '
+                'без параметра копирование выполняется один раз.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+        replicas = {
+            alias: connections[alias].settings_dict['NAME']
+            for alias in settings.READ_REPLICAS
+        }
+        if not replicas:
+            raise CommandError('READ_REPLICAS пуст.')
+        while True:
+            for alias, replica in replicas.items():
+                taken_at = time.time_ns() - COMMIT_MARGIN_NS
+                self.copy(primary, replica)
+                set_replica_snapshot(alias, taken_at)
+            self.stdout.write(f'Обновлено реплик: {len(replicas)}')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, primary, replica):
+        # Копия собирается рядом и подменяет реплику целиком: читатели
+        # видят либо старую, либо новую базу, но не промежуточное состояние.
+        tmp = f'{replica}.tmp'
+        source = sqlite3.connect(primary)
+        target = sqlite3.connect(tmp)
+        try:
+            source.backup(target)
+            target.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            target.close()
+            source.close()
+        os.replace(tmp, replica)
@@ -0,0 +1,103 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import apply_sqlite_pragmas
+
+FEED_QUERY = (
+    'SELECT id, title, pub_date FROM post '
+    'ORDER BY pub_date DESC LIMIT 10'
+)
+COMMENT_INSERT = 'INSERT INTO comment (post_id, text) VALUES (?, ?)'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает конкурентные чтение и запись в SQLite с настройками '
+        'по умолчанию и с SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=5.0)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        configs = (
+            ('по умолчанию', {}, {}),
+            (
+                'SQLITE_PRAGMAS',
+                settings.SQLITE_PRAGMAS,
+                settings.DATABASES['default'].get('OPTIONS', {}),
+            ),
+        )
+        for title, pragmas, connect_options in configs:
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / 'benchmark.sqlite3'
+                self.seed(path, options['rows'])
+                result = self.run(path, pragmas, connect_options, options)
+            elapsed = result['elapsed']
+            self.stdout.write(
+                f'{title}: чтений {result["reads"] / elapsed:.0f}/с,'
+                f' записей {result["writes"] / elapsed:.0f}/с,'
+                f' ошибок блокировки {result["errors"]}'
+            )
+
+    def seed(self, path, rows):
+        with sqlite3.connect(path) as db:
+            db.executescript(
+                'CREATE TABLE post ('
+                'id INTEGER PRIMARY KEY, title TEXT, pub_date INTEGER);'
+                'CREATE INDEX post_pub_date ON post (pub_date);'
+                'CREATE TABLE comment ('
+                'id INTEGER PRIMARY KEY, post_id INTEGER, text TEXT);'
+            )
+            db.executemany(
+                'INSERT INTO post (title, pub_date) VALUES (?, ?)',
+                ((f'Публикация {n}', n) for n in range(rows)),
+            )
+
+    def run(self, path, pragmas, connect_options, options):
+        deadline = time.monotonic() + options['duration']
+        counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def work(statement, params, name):
+            db = sqlite3.connect(
+                path, check_same_thread=False, **connect_options
+            )
+            apply_sqlite_pragmas(db, pragmas)
+            while time.monotonic() < deadline:
+                try:
+                    with db:
+                        db.execute(statement, params).fetchall()
+                    result = name
+                except sqlite3.OperationalError:
+                    result = 'errors'
+                with lock:
+                    counters[result] += 1
+            db.close()
+
+        threads = [
+            threading.Thread(target=work, args=(FEED_QUERY, (), 'reads'))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=work,
+                args=(COMMENT_INSERT, (1, 'Комментарий'), 'writes'),
+            )
+            for _ in range(options['writers'])
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counters['elapsed'] = time.monotonic() - started
+        return counters
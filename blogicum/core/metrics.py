@@ -0,0 +1,287 @@
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import OperationalError
+
+INITIAL_SIZE = 64 * 1024
+HEADER = struct.Struct('q')
+KEY_LENGTH = struct.Struct('i')
+VALUE = struct.Struct('d')
+FILE_PREFIX = 'metrics_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MmapValues:
+    """Значения метрик одного процесса в файле, отображённом в память.
+
+    Запись: длина ключа, ключ в UTF-8, выровненный до 8 байт, и значение
+    double. В заголовке — число занятых байт; его обновляют после записи
+    ключа, поэтому другие процессы читают файл без блокировок.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size < INITIAL_SIZE:
+            self._file.truncate(INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._lock = threading.Lock()
+        self._used = HEADER.unpack_from(self._map)[0] or HEADER.size
+        self._positions = {
+            key: position for key, _, position in read_entries(self._map)
+        }
+
+    def add(self, key, amount):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._add_key(key)
+            value = VALUE.unpack_from(self._map, position)[0]
+            VALUE.pack_into(self._map, position, value + amount)
+
+    def _add_key(self, key):
+        encoded = key.encode()
+        padding = -(KEY_LENGTH.size + len(encoded)) % 8
+        entry = struct.pack(
+            f'i{len(encoded)}s{padding}x', len(encoded), encoded
+        ) + VALUE.pack(0.0)
+        while self._used + len(entry) > len(self._map):
+            self._map.resize(len(self._map) * 2)
+        self._map[self._used:self._used + len(entry)] = entry
+        position = self._used + len(entry) - VALUE.size
+        self._used += len(entry)
+        HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+
+def read_entries(data):
+    """Ключи, значения и позиции значений из файла метрик."""
+    used = HEADER.unpack_from(data)[0]
+    position = HEADER.size
+    while position < used:
+        length = KEY_LENGTH.unpack_from(data, position)[0]
+        start = position + KEY_LENGTH.size
+        key = bytes(data[start:start + length]).decode()
+        position = start + length + (-(KEY_LENGTH.size + length) % 8)
+        yield key, VALUE.unpack_from(data, position)[0], position
+        position += VALUE.size
+
+
+_values = {}
+_values_lock = threading.Lock()
+
+
+def get_values():
+    """Файл значений текущего процесса в METRICS_DIR или None.
+
+    У каждого процесса свой файл, поэтому воркеры не мешают друг другу;
+    после fork дочерний процесс заводит новый файл.
+    """
+    if not settings.METRICS_DIR:
+        return None
+    key = (str(settings.METRICS_DIR), os.getpid())
+    with _values_lock:
+        if key not in _values:
+            _values[key] = MmapValues(
+                Path(settings.METRICS_DIR) / f'{FILE_PREFIX}{key[1]}.db'
+            )
+        return _values[key]
+
+
+def collect():
+    """Сумма значений по файлам всех процессов."""
+    totals = defaultdict(float)
+    for path in Path(settings.METRICS_DIR).glob(f'{FILE_PREFIX}*.db'):
+        with open(path, 'rb') as file:
+            data = file.read()
+        for key, value, _ in read_entries(data):
+            totals[key] += value
+    return totals
+
+
+def sample_key(name, labels):
+    return json.dumps([name, sorted(labels.items())], ensure_ascii=False)
+
+
+METRICS = []
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        METRICS.append(self)
+
+    def _add(self, name, labels, amount):
+        values = get_values()
+        if values is not None:
+            values.add(sample_key(name, labels), amount)
+
+    def samples(self, totals):
+        for key, value in sorted(totals.items()):
+            name, labels = json.loads(key)
+            if name == self.name:
+                yield name, dict(labels), value
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self._add(self.name, labels, amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, buckets):
+        super().__init__(name, documentation)
+        self.buckets = (*buckets, math.inf)
+
+    def observe(self, value, **labels):
+        bucket = next(bound for bound in self.buckets if value <= bound)
+        self._add(f'{self.name}_bucket', {**labels, 'le': bucket}, 1)
+        self._add(f'{self.name}_sum', labels, value)
+        self._add(f'{self.name}_count', labels, 1)
+
+    def samples(self, totals):
+        series = defaultdict(dict)
+        for key, value in totals.items():
+            name, labels = json.loads(key)
+            if name == f'{self.name}_bucket':
+                labels = dict(labels)
+                bound = labels.pop('le')
+                series[tuple(sorted(labels.items()))][bound] = value
+        for labels, buckets in sorted(series.items()):
+            labels = dict(labels)
+            cumulative = 0
+            for bound in self.buckets:
+                cumulative += buckets.get(bound, 0)
+                yield f'{self.name}_bucket', {
+                    **labels, 'le': format_value(bound)
+                }, cumulative
+            for suffix in ('sum', 'count'):
+                name = f'{self.name}_{suffix}'
+                yield name, labels, totals.get(sample_key(name, labels), 0)
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'),
+        )
+        for name, value in sorted(labels.items())
+    )
+    return f'{{{pairs}}}'
+
+
+def render_metrics():
+    """Метрики всех процессов в текстовом формате Prometheus."""
+    totals = collect() if settings.METRICS_DIR else {}
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for name, labels, value in metric.samples(totals):
+            lines.append(
+                f'{name}{format_labels(labels)} {format_value(value)}'
+            )
+    hits = totals.get(sample_key(CACHE_HITS.name, {}), 0)
+    misses = totals.get(sample_key(CACHE_MISSES.name, {}), 0)
+    lines.append(
+        '# HELP blogicum_cache_hit_ratio Доля попаданий в кэш.'
+    )
+    lines.append('# TYPE blogicum_cache_hit_ratio gauge')
+    lines.append(
+        'blogicum_cache_hit_ratio '
+        + format_value(hits / (hits + misses) if hits + misses else 0)
+    )
+    return '\n'.join(lines) + '\n'
+
+
+REQUESTS = Counter(
+    'blogicum_http_requests_total',
+    'Число запросов по представлению, методу и статусу.',
+)
+REQUEST_DURATION = Histogram(
+    'blogicum_http_request_duration_seconds',
+    'Время обработки запроса по представлению.',
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+REQUEST_QUERIES = Histogram(
+    'blogicum_db_queries_per_request',
+    'Число запросов к базе на запрос по представлению.',
+    (0, 1, 2, 3, 5, 8, 13, 21, 50),
+)
+CACHE_HITS = Counter(
+    'blogicum_cache_hits_total', 'Попадания в кэш при обработке запросов.'
+)
+CACHE_MISSES = Counter(
+    'blogicum_cache_misses_total', 'Промахи кэша при обработке запросов.'
+)
+MODEL_WRITES = Counter(
+    'blogicum_model_writes_total',
+    'Изменённые объекты моделей по модели и действию.',
+)
+SQLITE_LOCK_TIMEOUTS = Counter(
+    'blogicum_sqlite_lock_timeouts_total',
+    'Запросы, не дождавшиеся блокировки SQLite за busy_timeout.',
+)
+
+
+def record_request(sender, request, response, stats, **kwargs):
+    """Получатель request_measured: метрики запроса."""
+    match = request.resolver_match
+    view = match.view_name if match is not None else 'unresolved'
+    REQUESTS.inc(
+        view=view, method=request.method, status=response.status_code
+    )
+    REQUEST_DURATION.observe(stats.duration, view=view)
+    REQUEST_QUERIES.observe(len(stats.queries.queries), view=view)
+    if stats.cache_hits:
+        CACHE_HITS.inc(stats.cache_hits)
+    if stats.cache_misses:
+        CACHE_MISSES.inc(stats.cache_misses)
+
+
+def count_lock_timeouts(execute, sql, params, many, context):
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError as error:
+        if 'locked' in str(error):
+            SQLITE_LOCK_TIMEOUTS.inc(database=context['connection'].alias)
+        raise
+
+
+def install_lock_counter(sender, connection, **kwargs):
+    """Получатель connection_created: считает ожидания блокировок SQLite.
+
+    Обёртка ставится в начало списка, чтобы не мешать временным
+    обёрткам execute_wrapper, которые снимаются с конца.
+    """
+    if (
+        connection.vendor == 'sqlite'
+        and count_lock_timeouts not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.insert(0, count_lock_timeouts)
@@ -1,7 +1,52 @@
+import time
+
 from django.db import models
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+
+def next_version(current=0):
+    """Номер версии по часам в наносекундах, но не меньше current + 1.
+
+    Версии растут и внутри строки, и между строками, поэтому по ним можно
+    выбирать всё, что изменилось после известной версии.
+    """
+    return max(time.time_ns(), current + 1)
+
+
+class ChangeTrackedQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        """Массовое изменение тоже сдвигает дату и версию строк."""
+        kwargs.setdefault('updated_at', timezone.now())
+        kwargs.setdefault('version', Greatest(
+            models.F('version') + 1, models.Value(next_version())
+        ))
+        return super().update(**kwargs)
+
+
+class ChangeTrackedModel(models.Model):
+    """Абстрактная модель. Добавляет дату изменения и номер версии."""
+
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+    version = models.PositiveBigIntegerField(
+        'Версия', default=next_version, editable=False
+    )
+
+    objects = ChangeTrackedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if not self._state.adding:
+            self.version = next_version(self.version)
+        if update_fields is not None:
+            update_fields = {*update_fields, 'updated_at', 'version'}
+        super().save(*args, update_fields=update_fields, **kwargs)
 
 
-class PublishedModel(models.Model):
+class PublishedModel(ChangeTrackedModel):
     """Абстрактная модель. Добвляет флаг is_published."""
 
     is_published = models.BooleanField(
@@ -0,0 +1,132 @@
+import atexit
+import json
+import logging
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class PerfLog:
+    """Буферизованный журнал JSONL.
+
+    Запрос только добавляет строку в список; в файл строки дописывает
+    фоновый поток раз в flush_interval секунд или как только их
+    накопится buffer_size. Если файл недоступен, в памяти остаётся не
+    больше max_buffer_size строк, а лишние отбрасываются.
+    """
+
+    def __init__(self, path, buffer_size, flush_interval, max_buffer_size):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_buffer_size = max_buffer_size
+        self.dropped = 0
+        self._lines = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if len(self._lines) >= self.max_buffer_size:
+                self.dropped += 1
+                return
+            self._lines.append(line)
+            full = len(self._lines) >= self.buffer_size
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='perf-log', daemon=True
+                )
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                lines, self._lines = self._lines, []
+            if not lines:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as file:
+                    file.write(''.join(f'{line}\n' for line in lines))
+            except OSError:
+                # Строки возвращаются в буфер и пишутся следующей попыткой;
+                # при переполнении отбрасываются самые старые.
+                with self._lock:
+                    lines += self._lines
+                    self.dropped += max(0, len(lines) - self.max_buffer_size)
+                    self._lines = lines[-self.max_buffer_size:]
+                raise
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось записать журнал %s', self.path)
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_perf_log(path):
+    with _logs_lock:
+        if path not in _logs:
+            _logs[path] = PerfLog(
+                path,
+                settings.PERF_LOG_BUFFER_SIZE,
+                settings.PERF_LOG_FLUSH_INTERVAL,
+                settings.PERF_LOG_MAX_BUFFER_SIZE,
+            )
+        return _logs[path]
+
+
+@atexit.register
+def flush_perf_logs():
+    for perf_log in list(_logs.values()):
+        try:
+            perf_log.flush()
+        except OSError:
+            logger.exception('Не удалось записать журнал %s', perf_log.path)
+
+
+def make_record(request, response, stats):
+    match = request.resolver_match
+    slowest_time, slowest_sql = stats.queries.slowest
+    return {
+        'time': timezone.now().isoformat(),
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match is not None else None,
+        'status': response.status_code,
+        'duration_ms': round(stats.duration * 1000, 3),
+        'db_queries': len(stats.queries.queries),
+        'db_time_ms': round(stats.queries.time * 1000, 3),
+        'slowest_sql': slowest_sql,
+        'slowest_sql_ms': round(slowest_time * 1000, 3),
+        'cache_hits': stats.cache_hits,
+        'cache_misses': stats.cache_misses,
+        'template_ms': round(stats.template_time * 1000, 3),
+        'response_bytes': (
+            None if response.streaming else len(response.content)
+        ),
+    }
+
+
+def log_request(sender, request, response, stats, **kwargs):
+    """Получатель request_measured: пишет запись в PERF_LOG_PATH."""
+    if settings.PERF_LOG_PATH:
+        get_perf_log(settings.PERF_LOG_PATH).write(
+            make_record(request, response, stats)
+        )
@@ -0,0 +1,101 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY_COOKIE = 'read_primary'
+SNAPSHOT_KEY_PREFIX = 'replica:snapshot:'
+
+_read_replica = ContextVar('read_replica', default=None)
+
+
+@contextmanager
+def replica_reads():
+    """Чтения внутри блока идут в одну из реплик, если они настроены."""
+    replicas = settings.READ_REPLICAS
+    token = _read_replica.set(random.choice(replicas) if replicas else None)
+    try:
+        yield
+    finally:
+        _read_replica.reset(token)
+
+
+def reads_primary(request):
+    """Пользователь недавно писал и должен видеть свои изменения."""
+    return PRIMARY_COOKIE in request.COOKIES
+
+
+def uses_replicas(request):
+    """Чтения запроса пойдут в реплику."""
+    return (
+        bool(settings.READ_REPLICAS)
+        and request.method in ('GET', 'HEAD')
+        and not reads_primary(request)
+    )
+
+
+def set_replica_snapshot(alias, taken_at):
+    """Запоминает, до какого момента (time_ns) реплика содержит записи."""
+    cache.set(SNAPSHOT_KEY_PREFIX + alias, taken_at, None)
+
+
+def replicas_contain(changed_at):
+    """Изменение, сделанное в changed_at (time_ns), есть во всех репликах.
+
+    Реплика без отметки refresh_replicas считается отстающей.
+    """
+    keys = [SNAPSHOT_KEY_PREFIX + alias for alias in settings.READ_REPLICAS]
+    snapshots = cache.get_many(keys)
+    return len(snapshots) == len(keys) and changed_at < min(snapshots.values())
+
+
+def replica_lags(request, changed_at):
+    """Запрос читает из реплики, в которой ещё нет изменения changed_at."""
+    return uses_replicas(request) and not replicas_contain(changed_at)
+
+
+class ReplicaRouter:
+    """Пишет в default, а читает из READ_REPLICAS внутри replica_reads().
+
+    Вне replica_reads() и без настроенных реплик всё идёт в default, так
+    что на реплики переводятся только явно выбранные представления.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.READ_REPLICAS
+
+
+class ReadYourWritesMiddleware:
+    """После записи направляет чтения пользователя в default.
+
+    Любой запрос, кроме GET, HEAD и OPTIONS, ставит cookie на
+    READ_YOUR_WRITES_SECONDS секунд; пока она есть, реплики не
+    используются, и отставание реплики не прячет свежие изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                '1',
+                max_age=settings.READ_YOUR_WRITES_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
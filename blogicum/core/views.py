@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+
+from core.metrics import CONTENT_TYPE, render_metrics
+
+
+def metrics(request):
+    """Метрики в текстовом формате Prometheus.
+
+    Доступны с адресов METRICS_ALLOWED_IPS и сотрудникам сайта.
+    """
+    if not settings.METRICS_DIR:
+        raise Http404
+    if (
+        request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS
+        and not request.user.is_staff
+    ):
+        raise PermissionDenied
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
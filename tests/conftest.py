@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,30 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def disable_metrics_files():
+    with override_settings(METRICS_DIR=None):
+        yield
+
+
+@pytest.fixture(scope="session")
+def cache_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("cache")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(cache_dir):
+    with override_settings(CACHES={
+        "default": {
+            "BACKEND": "core.instrumentation.FileBasedCache",
+            "LOCATION": cache_dir,
+        },
+    }):
+        cache.clear()
+        yield
+        cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
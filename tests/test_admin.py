@@ -0,0 +1,178 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.admin import INLINE_POSTS
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def admin_client(mixer):
+    admin = mixer.blend(
+        "auth.User", is_staff=True, is_superuser=True, is_active=True
+    )
+    client = Client()
+    client.force_login(admin)
+    return client
+
+
+def count_queries(client: Client, url: str):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [query["sql"] for query in ctx.captured_queries]
+
+
+def test_post_changelist_queries_do_not_grow(
+        admin_client, mixer, user, published_category, published_location
+):
+    def blend_posts(n):
+        mixer.cycle(n).blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=published_location,
+        )
+
+    blend_posts(2)
+    few = count_queries(admin_client, "/admin/blog/post/")
+    blend_posts(20)
+    many = count_queries(admin_client, "/admin/blog/post/")
+    assert len(many) == len(few), (
+        "Убедитесь, что число запросов списка публикаций в админке не"
+        " зависит от числа публикаций. Выполнены запросы:\n"
+        + "\n".join(many)
+    )
+    full_count = 'COUNT(*) AS "__count" FROM "blog_post"'
+    assert not any(full_count in sql for sql in many), (
+        "Убедитесь, что список публикаций в админке не считает всю таблицу"
+        " через COUNT(*)."
+    )
+    assert not any(', "blog_post"."text",' in sql for sql in many), (
+        "Убедитесь, что список публикаций в админке не загружает полный"
+        " текст публикаций."
+    )
+
+
+@pytest.mark.parametrize("model", ("category", "location"))
+def test_change_page_post_inline_is_bounded(
+        admin_client, mixer, user, published_category, published_location,
+        model
+):
+    def blend_posts(n):
+        mixer.cycle(n).blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=published_location,
+        )
+
+    obj = published_category if model == "category" else published_location
+    url = f"/admin/blog/{model}/{obj.id}/change/"
+    blend_posts(2)
+    admin_client.get(url)
+    few = count_queries(admin_client, url)
+    blend_posts(INLINE_POSTS * 2)
+    many = count_queries(admin_client, url)
+    assert len(many) == len(few), (
+        f"Убедитесь, что число запросов страницы `{url}` не зависит от"
+        " числа публикаций. Выполнены запросы:\n" + "\n".join(many)
+    )
+    response = admin_client.get(url)
+    formset = response.context["inline_admin_formsets"][0].formset
+    assert len(formset.forms) == INLINE_POSTS, (
+        f"Убедитесь, что на странице `{url}` выводятся только последние"
+        " публикации."
+    )
+    assert f"?{model}__id__exact={obj.id}" in response.content.decode()
+    response = admin_client.post(url, {
+        **{
+            key: value for key, value in response.context[
+                "adminform"
+            ].form.initial.items() if value is not None
+        },
+        **{
+            f"{formset.prefix}-{key}": value
+            for key, value in formset.management_form.initial.items()
+        },
+        **{
+            f"{form.prefix}-id": form.instance.pk for form in formset.forms
+        },
+    })
+    assert response.status_code == 302, (
+        f"Убедитесь, что страница `{url}` сохраняется вместе с последними"
+        " публикациями."
+    )
+
+
+def test_comment_changelist(admin_client, mixer, post_with_published_location):
+    post = post_with_published_location
+
+    def blend_comments(n):
+        return mixer.cycle(n).blend("blog.Comment", post=post)
+
+    blend_comments(2)
+    admin_client.get("/admin/blog/comment/")
+    few = count_queries(admin_client, "/admin/blog/comment/")
+    comments = blend_comments(20)
+    many = count_queries(admin_client, "/admin/blog/comment/")
+    assert len(many) == len(few), (
+        "Убедитесь, что число запросов списка комментариев в админке не"
+        " зависит от числа комментариев. Выполнены запросы:\n"
+        + "\n".join(many)
+    )
+
+    comment = comments[0]
+    comment.text = "Совершенно уникальнейшее слово"
+    comment.save()
+    for search_term in ("уникальнейш", comment.author.username):
+        response = admin_client.get(
+            "/admin/blog/comment/", {"q": search_term}
+        )
+        found = list(response.context["cl"].result_list)
+        assert comment in found, (
+            "Убедитесь, что в админке комментарии ищутся по словам текста и"
+            " по имени автора."
+        )
+    assert admin_client.get(
+        f"/admin/blog/comment/{comment.id}/change/"
+    ).status_code == 200
+    comment.delete()
+    response = admin_client.get("/admin/blog/comment/", {"q": "уникальн"})
+    assert not response.context["cl"].result_list
+
+
+def test_comment_cannot_move_to_another_post(
+        admin_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend(
+        "blog.Post", author=post.author, category=post.category
+    )
+    comment = mixer.blend("blog.Comment", post=post)
+    admin_client.post(f"/admin/blog/comment/{comment.id}/change/", {
+        "text": "Исправлено",
+        "post": other.id,
+        "author": comment.author_id,
+    })
+    comment.refresh_from_db()
+    post.refresh_from_db()
+    other.refresh_from_db()
+    assert comment.text == "Исправлено"
+    assert (comment.post_id, post.comment_count, other.comment_count) == (
+        post.id, 1, 0
+    ), (
+        "Убедитесь, что в админке нельзя перенести комментарий к другой"
+        " публикации: счётчики comment_count этого не учитывают."
+    )
+
+
+def test_comment_str_does_not_query(
+        django_assert_num_queries, mixer, post_with_published_location
+):
+    comment = mixer.blend("blog.Comment", post=post_with_published_location)
+    comment = type(comment).objects.get(pk=comment.pk)
+    with django_assert_num_queries(0):
+        assert comment.text[:10] in str(comment)
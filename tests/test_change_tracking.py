@@ -0,0 +1,57 @@
+import pytest
+
+from blog.cache import FEED_TABLES, get_last_modified, get_versions
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_save_moves_updated_at_and_version(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    updated_at, version = post.updated_at, post.version
+    post.title = "Новый заголовок"
+    post.save()
+    post.refresh_from_db()
+    assert post.updated_at > updated_at and post.version > version, (
+        "Убедитесь, что сохранение публикации обновляет дату изменения и"
+        " увеличивает версию."
+    )
+
+    comment = mixer.blend("blog.Comment", post=post)
+    version = comment.version
+    comment.text = "Исправленный комментарий"
+    comment.save(update_fields=("text",))
+    comment.refresh_from_db()
+    assert comment.version > version
+
+
+def test_queryset_update_moves_version(post_with_published_location):
+    post = post_with_published_location
+    table_version = get_versions(("post",))["post"]
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    updated = Post.objects.get(pk=post.pk)
+    assert updated.version > post.version, (
+        "Убедитесь, что массовое изменение публикаций увеличивает их версию."
+    )
+    assert updated.updated_at > post.updated_at
+    assert get_versions(("post",))["post"] > table_version, (
+        "Убедитесь, что изменение публикаций сдвигает счётчик таблицы в кэше."
+    )
+
+
+def test_last_modified(client, mixer, post_with_published_location):
+    post = post_with_published_location
+    last_modified = get_last_modified(FEED_TABLES)
+    response = client.get("/")
+    assert response.has_header("Last-Modified")
+    response = client.get(
+        "/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert response.status_code == 304, (
+        "Убедитесь, что лента отвечает 304 на запрос с If-Modified-Since,"
+        " если с тех пор ничего не менялось."
+    )
+    mixer.blend("blog.Comment", post=post)
+    assert get_last_modified(FEED_TABLES) >= last_modified
@@ -0,0 +1,99 @@
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.urls import reverse
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = 3
+
+
+@pytest.fixture
+def comments(mixer, post_with_published_location, user, another_user):
+    return [
+        mixer.blend(
+            "blog.Comment",
+            post=post_with_published_location,
+            author=author,
+        )
+        for author in (user, another_user, another_user)
+    ]
+
+
+def get_comment_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_new_comments_increment(comments):
+    assert get_comment_count(comments[0].post) == N_COMMENTS, (
+        "Убедитесь, что новый комментарий увеличивает счётчик комментариев"
+        " публикации."
+    )
+
+
+def test_delete_view_decrements(user_client, comments):
+    comment = comments[0]
+    user_client.post(reverse("blog:delete_comment", kwargs={
+        "post_id": comment.post_id, "comment_id": comment.id,
+    }))
+    assert get_comment_count(comment.post) == N_COMMENTS - 1, (
+        "Убедитесь, что удаление комментария уменьшает счётчик комментариев"
+        " публикации."
+    )
+
+
+def test_admin_bulk_delete_decrements(admin_client, comments):
+    admin_client.post("/admin/blog/comment/", {
+        "action": "delete_selected",
+        "_selected_action": [comment.id for comment in comments[1:]],
+        "post": "yes",
+    })
+    assert get_comment_count(comments[0].post) == 1, (
+        "Убедитесь, что массовое удаление комментариев в админке уменьшает"
+        " счётчик комментариев публикации."
+    )
+
+
+def test_user_cascade_decrements(another_user, comments):
+    another_user.delete()
+    assert get_comment_count(comments[0].post) == 1, (
+        "Убедитесь, что при удалении пользователя счётчики публикаций"
+        " уменьшаются на число его комментариев."
+    )
+
+
+def test_failed_post_delete_keeps_counting(comments):
+    post = comments[0].post
+
+    def fail(**kwargs):
+        raise RuntimeError
+
+    pre_delete.connect(fail, sender=Post)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=Post)
+    assert get_comment_count(post) == N_COMMENTS
+    comments[0].delete()
+    assert get_comment_count(post) == N_COMMENTS - 1, (
+        "Убедитесь, что после неудачного удаления публикации удаление её"
+        " комментариев по-прежнему уменьшает счётчик."
+    )
+
+
+def test_backfill_migration(comments):
+    post = comments[0].post
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+    migration = import_module("blog.migrations.0007_post_comment_count")
+    migration.backfill_comment_count(apps, None)
+    assert get_comment_count(post) == N_COMMENTS, (
+        "Убедитесь, что миграция 0007 заполняет счётчики комментариев."
+    )
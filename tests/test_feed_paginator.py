@@ -0,0 +1,78 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from blog.models import Post
+from blog.paginators import FeedPaginator
+from blog.views import PostListView
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_count(cache_key="test-feed"):
+    paginator = FeedPaginator(
+        Post.objects.order_by("-pub_date"), N_PER_PAGE, cache_key=cache_key
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        count = paginator.count
+    return count, bool(ctx.captured_queries)
+
+
+def test_feed_paginator_caches_count(
+        mixer, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    assert get_count() == (len(posts), True)
+    assert get_count() == (len(posts), False), (
+        "Убедитесь, что число публикаций ленты берётся из кэша."
+    )
+    posts[0].delete()
+    assert get_count() == (len(posts) - 1, True), (
+        "Убедитесь, что кэш числа публикаций сбрасывается при удалении поста."
+    )
+    posts[1].category.is_published = False
+    posts[1].category.save()
+    assert get_count()[1], (
+        "Убедитесь, что кэш числа публикаций сбрасывается при изменении"
+        " категории."
+    )
+
+
+def test_feed_paginator_elides_page_range(mixer, user, published_category):
+    mixer.cycle(N_PER_PAGE * 30).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    paginator = FeedPaginator(
+        Post.objects.order_by("-pub_date"), N_PER_PAGE, cache_key="test-feed"
+    )
+    page_range = paginator.page(15).elided_page_range
+    assert page_range == [
+        1, paginator.ELLIPSIS, 13, 14, 15, 16, 17, paginator.ELLIPSIS, 30
+    ]
+
+
+def test_page_number_mode(mixer, user, published_category):
+    mixer.cycle(N_PER_PAGE * 3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    request = RequestFactory().get("/?page=2")
+    request.user = AnonymousUser()
+    request.resolver_match = resolve("/")
+    view = PostListView.as_view(keyset_pagination=False)
+    response = view(request)
+    response.render()
+    page_obj = response.context_data["page_obj"]
+    assert isinstance(page_obj.paginator, FeedPaginator), (
+        "Убедитесь, что без keyset_pagination лента разбивается на страницы"
+        " по номерам через FeedPaginator."
+    )
+    assert page_obj.number == 2 and len(page_obj) == N_PER_PAGE
+    content = response.content.decode("utf-8")
+    assert 'href="?page=3"' in content and "?after=" not in content, (
+        "Убедитесь, что в режиме номеров страниц шаблон пагинатора выводит"
+        " ссылки на номера страниц."
+    )
@@ -0,0 +1,111 @@
+import pytest
+from django.test.client import Client
+from django.utils.http import urlsafe_base64_encode
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk(client: Client, url: str, param: str, cursor_attr: str):
+    seen = []
+    response = client.get(url)
+    while True:
+        page_obj = response.context["page_obj"]
+        seen.extend(post.id for post in page_obj)
+        cursor = getattr(page_obj, cursor_attr)
+        if not cursor:
+            return response, seen
+        response = client.get(f"{url}?{param}={cursor}")
+
+
+def test_keyset_pagination_walks_whole_feed(
+        user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    expected = [
+        post.id for post in sorted(
+            posts, key=lambda p: (p.pub_date, p.id), reverse=True
+        )
+    ]
+    category_slug = posts[0].category.slug
+    for url in (
+        "/",
+        f"/category/{category_slug}/",
+        f"/profile/{posts[0].author.username}/",
+    ):
+        last_response, seen = _walk(user_client, url, "after", "next_cursor")
+        assert seen == expected, (
+            f"Убедитесь, что курсорная пагинация на странице `{url}` обходит"
+            " все публикации «от новых к старым» без пропусков и повторов."
+        )
+        assert len(last_response.context["page_obj"]) == (
+            len(posts) - N_PER_PAGE
+        )
+        previous_cursor = last_response.context["page_obj"].previous_cursor
+        response = user_client.get(f"{url}?before={previous_cursor}")
+        assert [post.id for post in response.context["page_obj"]] == (
+            expected[:N_PER_PAGE]
+        ), (
+            f"Убедитесь, что ссылка на предыдущую страницу `{url}` возвращает"
+            " предыдущую страницу ленты."
+        )
+
+
+def test_keyset_pagination_rejects_broken_cursor(user_client):
+    response = user_client.get("/?after=broken")
+    assert response.status_code == 404, (
+        "Убедитесь, что некорректный курсор пагинации приводит к ошибке 404."
+    )
+
+
+@pytest.mark.parametrize("value", (
+    "2024-01-01T00:00:00+00:00|" + "9" * 20,
+    "2024-01-01T00:00:00+00:00|0",
+    "2024-01-01T00:00:00|1",
+))
+def test_keyset_pagination_rejects_out_of_range_cursor(
+        client, post_with_published_location, value
+):
+    cursor = urlsafe_base64_encode(value.encode())
+    for url in ("/", f"/posts/{post_with_published_location.id}/comments/"):
+        response = client.get(f"{url}?after={cursor}")
+        assert response.status_code == 404, (
+            f"Убедитесь, что курсор `{value}` на странице `{url}` приводит"
+            " к ошибке 404: id вне диапазона INTEGER или дата без часового"
+            " пояса."
+        )
+
+
+def test_comment_pages(
+        client, mixer, post_with_published_location, another_user
+):
+    post = post_with_published_location
+    comments = mixer.cycle(25).blend(
+        "blog.Comment", post=post, author=another_user
+    )
+    response = client.get(f"/posts/{post.id}/")
+    page = response.context["comments_page"]
+    assert [c.id for c in page] == [c.id for c in comments[:20]], (
+        "Убедитесь, что на странице публикации выводится первая страница"
+        " комментариев «от старых к новым»."
+    )
+    url = f"/posts/{post.id}/comments/?after={page.next_cursor}"
+    response = client.get(url)
+    assert [c.id for c in response.context["comments"]] == [
+        c.id for c in comments[20:]
+    ]
+    assert not response.context["comments_page"].has_next()
+
+    data = client.get(url, HTTP_ACCEPT="application/json").json()
+    assert data["next_cursor"] is None
+    assert comments[-1].text.split()[0] in data["html"]
+
+
+def test_comment_pages_hidden_for_invisible_post(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from blog.live import broker
+from blogicum.asgi import application
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def http_scope(path):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 1),
+        "server": ("testserver", 80),
+    }
+
+
+def test_live_comments_stream(user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/comments/live/"
+    text = "Комментарий в прямом эфире"
+
+    async def scenario():
+        messages = []
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if text in message.get("body", b"").decode():
+                disconnected.set()
+            elif message.get("body", b"").startswith(b"retry"):
+                assert broker.has_subscribers(post.id)
+                await sync_to_async(user_client.post)(
+                    f"/posts/{post.id}/comment/", {"text": text}
+                )
+
+        await asyncio.wait_for(
+            application(http_scope(url), receive, send), timeout=5
+        )
+        return messages
+
+    messages = asyncio.run(scenario())
+    assert messages[0]["status"] == 200
+    assert (b"content-type", b"text/event-stream") in messages[0]["headers"]
+    assert b"event: comment" in messages[-1]["body"], (
+        "Убедитесь, что новый комментарий приходит подписчикам потока"
+        " комментариев публикации."
+    )
+    assert not broker.has_subscribers(post.id), (
+        "Убедитесь, что после отключения читателя подписка удаляется."
+    )
+
+
+def test_live_comments_hidden_post(client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+
+    async def scenario():
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await application(
+            http_scope(f"/posts/{post.id}/comments/live/"), None, send
+        )
+        return messages
+
+    assert asyncio.run(scenario())[0]["status"] == 404
+    # Без ASGI поток не поддерживается, EventSource не переподключается.
+    response = client.get(f"/posts/{post.id}/comments/live/")
+    assert response.status_code == 204
@@ -0,0 +1,109 @@
+import multiprocessing
+
+import pytest
+from django.db import OperationalError, connection
+from django.urls import reverse
+
+from core.metrics import (
+    MODEL_WRITES, REQUESTS, SQLITE_LOCK_TIMEOUTS, collect,
+    count_lock_timeouts, sample_key,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path / "metrics"
+    return settings.METRICS_DIR
+
+
+def get_sample(name, **labels):
+    return collect().get(sample_key(name, labels), 0)
+
+
+def test_metrics_endpoint(client, post_with_published_location):
+    client.get(reverse("blog:index"))
+    client.get(reverse("blog:index"))
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    content = response.content.decode()
+    for line in (
+        "# TYPE blogicum_http_requests_total counter",
+        'blogicum_http_requests_total{method="GET",status="200",'
+        'view="blog:index"} 2.0',
+        'blogicum_http_request_duration_seconds_bucket{le="+Inf",'
+        'view="blog:index"} 2.0',
+        'blogicum_http_request_duration_seconds_count{view="blog:index"}'
+        " 2.0",
+        'blogicum_db_queries_per_request_count{view="blog:index"} 2.0',
+    ):
+        assert line in content, (
+            f"Убедитесь, что страница `/metrics` содержит строку `{line}`."
+        )
+    assert "blogicum_cache_hits_total " in content
+    assert "blogicum_cache_hit_ratio " in content
+
+
+def test_metrics_hidden_from_public(
+        settings, client, user_client, admin_client
+):
+    settings.METRICS_ALLOWED_IPS = ()
+    assert client.get("/metrics").status_code == 403, (
+        "Убедитесь, что `/metrics` недоступна с адресов не из"
+        " METRICS_ALLOWED_IPS."
+    )
+    assert user_client.get("/metrics").status_code == 403
+    assert admin_client.get("/metrics").status_code == 200, (
+        "Убедитесь, что `/metrics` доступна сотрудникам сайта."
+    )
+
+
+def test_metrics_disabled(settings, client):
+    settings.METRICS_DIR = None
+    assert client.get("/metrics").status_code == 404
+
+
+def test_model_writes_are_counted(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(
+        reverse("blog:add_comment", kwargs={"post_id": post.id}),
+        {"text": "Комментарий"},
+    )
+    assert get_sample(
+        MODEL_WRITES.name, model="comment", action="create"
+    ) == 1, "Убедитесь, что созданные комментарии учитываются в метриках."
+
+
+def increment_in_child():
+    REQUESTS.inc(view="child", method="GET", status=200)
+
+
+def test_metrics_aggregate_across_processes():
+    REQUESTS.inc(view="child", method="GET", status=200)
+    process = multiprocessing.get_context("fork").Process(
+        target=increment_in_child
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert get_sample(
+        REQUESTS.name, view="child", method="GET", status=200
+    ) == 2, "Убедитесь, что метрики суммируются по всем процессам."
+
+
+def test_sqlite_lock_timeouts_are_counted():
+    connection.ensure_connection()
+    assert count_lock_timeouts in connection.execute_wrappers
+
+    def locked(*args):
+        raise OperationalError("database is locked")
+
+    with pytest.raises(OperationalError):
+        count_lock_timeouts(
+            locked, "UPDATE", (), False, {"connection": connection}
+        )
+    assert get_sample(SQLITE_LOCK_TIMEOUTS.name, database="default") == 1
@@ -0,0 +1,87 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog import moderation
+from blog.models import Category, Post
+from blog.moderation import pk_chunks, set_published, start_in_background
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    return mixer.cycle(5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def test_set_published_in_chunks(
+        client, django_assert_max_num_queries, posts
+):
+    response = client.get("/")
+    assert len(response.context["page_obj"]) == len(posts)
+    queryset = Post.objects.all()
+    # На пачку: выбор ключей, UPDATE и два UPDATE пересчёта видимости.
+    # Число запросов зависит от числа пачек, а не от числа строк.
+    with django_assert_max_num_queries(3 * 4 + 1):
+        assert set_published(Post, pk_chunks(queryset, 2), False) == 5
+    assert not Post.objects.visible().exists(), (
+        "Убедитесь, что массовое снятие с публикации скрывает публикации"
+        " из лент."
+    )
+    assert not client.get("/").context["page_obj"], (
+        "Убедитесь, что массовое снятие с публикации сбрасывает кэш лент."
+    )
+
+
+def test_set_published_command(posts, published_category):
+    call_command("set_published", "category", published_category.id,
+                 "--unpublish")
+    assert not Category.objects.get(pk=published_category.id).is_published
+    assert not Post.objects.visible().exists()
+    call_command("set_published", "category", "--all")
+    assert Post.objects.visible().count() == len(posts)
+    with pytest.raises(CommandError):
+        call_command("set_published", "post")
+
+
+def test_publish_admin_action(mixer, client, posts):
+    admin = mixer.blend(
+        "auth.User", is_staff=True, is_superuser=True, is_active=True
+    )
+    client.force_login(admin)
+    response = client.post("/admin/blog/post/", {
+        "action": "unpublish",
+        "_selected_action": [post.id for post in posts[:3]],
+    })
+    assert response.status_code == 302
+    assert Post.objects.filter(is_published=False).count() == 3, (
+        "Убедитесь, что в админке есть действие снятия выбранных"
+        " публикаций с публикации."
+    )
+    assert Post.objects.visible().count() == 2
+
+
+def test_background_errors_are_logged(monkeypatch, caplog):
+    def set_published_chunk(model, pks, is_published):
+        if pks[0] > 2:
+            raise RuntimeError("Сбой базы")
+        return len(pks)
+
+    monkeypatch.setattr(
+        moderation, "set_published_chunk", set_published_chunk
+    )
+    start_in_background(
+        set_published, Post, iter([[1, 2], [3, 4]]), False
+    ).join()
+    assert "blog.Post" in caplog.text and "pk=2" in caplog.text, (
+        "Убедитесь, что при ошибке фонового изменения в журнал пишутся"
+        " модель и последний обработанный pk."
+    )
+    assert "Сбой базы" in caplog.text, (
+        "Убедитесь, что ошибка фоновой задачи пишется в журнал."
+    )
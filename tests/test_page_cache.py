@@ -0,0 +1,181 @@
+import multiprocessing
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog import cache as blog_cache
+from blog.cache import get_page_cache_stats
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_content(client: Client, url: str):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.content.decode("utf-8"), len(ctx.captured_queries)
+
+
+def test_anonymous_pages_are_cached(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+    for url in urls:
+        content, _ = get_content(client, url)
+        cached_content, n_queries = get_content(client, url)
+        assert cached_content == content
+        assert n_queries == 0, (
+            f"Убедитесь, что страница `{url}` для анонимного пользователя"
+            " отдаётся из кэша без запросов к базе данных."
+        )
+    stats = get_page_cache_stats()
+    assert stats["hits"] == len(urls)
+    assert stats["misses"] == len(urls)
+
+
+@pytest.mark.parametrize("change", ("post", "category", "location", "author"))
+def test_page_cache_invalidated_by_model_changes(
+        change, client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    get_content(client, url)
+    if change == "post":
+        post.title = "Новый заголовок"
+        post.save()
+        expected = post.title
+    elif change == "category":
+        post.category.title = "Новая категория"
+        post.category.save()
+        expected = post.category.title
+    elif change == "location":
+        post.location.name = "Новое место"
+        post.location.save()
+        expected = post.location.name
+    else:
+        post.author.username = "new_author_name"
+        post.author.save()
+        expected = post.author.username
+    for page_url in (url, "/"):
+        content, _ = get_content(client, page_url)
+        assert expected in content, (
+            f"Убедитесь, что кэш страницы `{page_url}` сбрасывается при"
+            " изменении связанных с ней объектов."
+        )
+
+
+def test_page_cache_invalidated_by_comment(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    get_content(client, "/")
+    get_content(client, f"/posts/{post.id}/")
+    comment = mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    content, _ = get_content(client, f"/posts/{post.id}/")
+    assert comment.text in content
+    content, _ = get_content(client, "/")
+    assert "Комментарии (1)" in content
+
+
+def test_logged_in_pages_are_not_cached(
+        user_client, post_with_published_location
+):
+    get_content(user_client, "/")
+    _, n_queries = get_content(user_client, "/")
+    assert n_queries > 0
+
+
+def test_post_card_fragment_cached_and_invalidated(
+        user_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    response = user_client.get("/")
+    card_version = response.context["page_obj"][0].card_version
+    key = make_template_fragment_key("post_card", [post.pk, card_version])
+    assert cache.get(key), (
+        "Убедитесь, что карточка публикации кэшируется отдельно от страницы."
+    )
+    mixer.blend("blog.Comment", post=post)
+    content, _ = get_content(user_client, "/")
+    assert "Комментарии (1)" in content, (
+        "Убедитесь, что кэш карточки публикации сбрасывается при изменении"
+        " числа комментариев."
+    )
+
+
+@pytest.mark.parametrize("is_anonymous", (True, False))
+def test_conditional_get(
+        client, user_client, mixer, post_with_published_location, is_anonymous
+):
+    post = post_with_published_location
+    http_client = client if is_anonymous else user_client
+    for url in ("/", f"/posts/{post.id}/"):
+        etag = http_client.get(url).get("ETag")
+        assert etag, f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+        response = http_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f"Убедитесь, что повторный запрос страницы `{url}` с совпадающим"
+            " ETag получает ответ 304."
+        )
+    etag = http_client.get(f"/posts/{post.id}/").get("ETag")
+    mixer.blend("blog.Comment", post=post)
+    response = http_client.get(f"/posts/{post.id}/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag страницы публикации меняется после добавления"
+        " комментария."
+    )
+
+
+def test_etag_changes_after_relogin(user, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    http_client = Client()
+    http_client.force_login(user)
+    etag = http_client.get(url)["ETag"]
+    http_client.logout()
+    http_client.force_login(user)
+    response = http_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после повторного входа страница с формой"
+        " комментария не отдаётся из кэша браузера с устаревшим CSRF-токеном."
+    )
+
+
+def bump_in_child(name):
+    blog_cache.bump_versions(name)
+
+
+def test_versions_are_shared_between_processes(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    get_content(client, url)
+    etag = client.get(url)["ETag"]
+    Post.objects.filter(pk=post.pk).update(title="Новый заголовок")
+    # Изменение обработал другой воркер: версия сдвигается в его процессе.
+    process = multiprocessing.get_context("fork").Process(
+        target=bump_in_child, args=(f"post:{post.pk}",)
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    content, _ = get_content(client, url)
+    assert "Новый заголовок" in content, (
+        "Убедитесь, что версии объектов хранятся в общем для всех процессов"
+        " кэше и изменение в одном воркере сбрасывает страницы в других."
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag меняется после изменения в другом процессе."
+    )
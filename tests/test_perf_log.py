@@ -0,0 +1,125 @@
+import json
+import time
+
+import pytest
+from django.urls import reverse
+
+from core import perflog
+from core.perflog import PerfLog, flush_perf_logs, get_perf_log
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def perf_log_path(settings, tmp_path):
+    settings.PERF_LOG_PATH = tmp_path / "requests.jsonl"
+    settings.PERF_LOG_FLUSH_INTERVAL = 60
+    yield settings.PERF_LOG_PATH
+    flush_perf_logs()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def read_records(path):
+    flush_perf_logs()
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_request_is_logged(
+        client, perf_log_path, post_with_published_location
+):
+    post = post_with_published_location
+    url = reverse("blog:post_detail", kwargs={"post_id": post.id})
+    response = client.get(url)
+    records = read_records(perf_log_path)
+    assert len(records) == 1, (
+        "Убедитесь, что на каждый запрос в журнал производительности"
+        " пишется одна запись."
+    )
+    record = records[0]
+    assert record["view"] == "blog:post_detail"
+    assert record["path"] == url
+    assert record["status"] == 200
+    assert record["response_bytes"] == len(response.content)
+    assert record["db_queries"] > 0
+    assert record["slowest_sql"].startswith("SELECT")
+    assert record["cache_misses"] > 0
+    assert record["template_ms"] > 0
+    assert record["duration_ms"] >= record["db_time_ms"]
+
+
+def test_cached_page_hits_are_logged(
+        client, perf_log_path, post_with_published_location
+):
+    client.get(reverse("blog:index"))
+    client.get(reverse("blog:index"))
+    first, second = read_records(perf_log_path)
+    assert second["cache_misses"] < first["cache_misses"], (
+        "Убедитесь, что в журнале учитываются попадания и промахи кэша."
+    )
+    assert second["cache_hits"] > 0
+    assert second["template_ms"] == 0
+
+
+def test_records_are_buffered(client, perf_log_path):
+    client.get(reverse("pages:about"))
+    assert not perf_log_path.exists(), (
+        "Убедитесь, что записи журнала буферизуются, а не пишутся в файл"
+        " при каждом запросе."
+    )
+    perf_log = get_perf_log(perf_log_path)
+    perf_log.buffer_size = 2
+    client.get(reverse("pages:rules"))
+    wait_for(perf_log_path.exists)
+    assert perf_log_path.exists(), (
+        "Убедитесь, что полный буфер журнала записывается в файл."
+    )
+    assert len(read_records(perf_log_path)) == 2
+
+
+def test_disabled_by_default(client, settings):
+    assert settings.PERF_LOG_PATH is None, (
+        "Убедитесь, что журнал производительности по умолчанию отключён."
+    )
+    logs = dict(perflog._logs)
+    client.get(reverse("pages:about"))
+    assert perflog._logs == logs
+
+
+def test_write_errors_keep_records_bounded(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    perf_log = PerfLog(blocker / "requests.jsonl", 100, 60, 3)
+    for number in range(5):
+        perf_log.write({"number": number})
+    with pytest.raises(OSError):
+        perf_log.flush()
+    assert perf_log.dropped == 2, (
+        "Убедитесь, что буфер журнала не растёт больше"
+        " PERF_LOG_MAX_BUFFER_SIZE."
+    )
+    perf_log.path = tmp_path / "requests.jsonl"
+    perf_log.flush()
+    assert [record["number"] for record in read_records(perf_log.path)] == [
+        0, 1, 2
+    ]
+
+
+def test_flush_errors_do_not_stop_the_thread(tmp_path, caplog):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    perf_log = PerfLog(blocker / "requests.jsonl", 1, 60, 100)
+    perf_log.write({"number": 0})
+    wait_for(lambda: "Не удалось записать журнал" in caplog.text)
+    perf_log.path = tmp_path / "requests.jsonl"
+    perf_log.write({"number": 1})
+    wait_for(perf_log.path.exists)
+    assert perf_log._thread.is_alive(), (
+        "Убедитесь, что ошибка записи журнала не останавливает фоновый"
+        " поток."
+    )
@@ -0,0 +1,134 @@
+import pytest
+from django.conf import settings
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+
+from core.budgets import QueryBudgetExceeded, count_queries
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = 30
+N_COMMENTS = 30
+
+
+@pytest.fixture(autouse=True)
+def raise_on_exceeded_budget(settings):
+    settings.QUERY_BUDGET_RAISE = True
+
+
+@pytest.fixture
+def seeded(mixer, user, another_user, published_category, published_location):
+    posts = mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+    post = posts[0]
+    mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment", post=post, author=another_user
+    )
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    return post, comment
+
+
+def get_urls(post, comment):
+    post_kwargs = {"post_id": post.id}
+    comment_kwargs = {"post_id": post.id, "comment_id": comment.id}
+    return {
+        "blog:index": reverse("blog:index"),
+        "blog:post_detail": reverse("blog:post_detail", kwargs=post_kwargs),
+        "blog:category_posts": reverse(
+            "blog:category_posts",
+            kwargs={"category_slug": post.category.slug},
+        ),
+        "blog:profile": reverse(
+            "blog:profile", kwargs={"username": post.author.username}
+        ),
+        "blog:comments": reverse("blog:comments", kwargs=post_kwargs),
+        "blog:create_post": reverse("blog:create_post"),
+        "blog:edit_post": reverse("blog:edit_post", kwargs=post_kwargs),
+        "blog:delete_post": reverse("blog:delete_post", kwargs=post_kwargs),
+        "blog:edit_comment": reverse(
+            "blog:edit_comment", kwargs=comment_kwargs
+        ),
+        "blog:delete_comment": reverse(
+            "blog:delete_comment", kwargs=comment_kwargs
+        ),
+        "blog:edit_profile": reverse("blog:edit_profile"),
+        "pages:about": reverse("pages:about"),
+        "pages:rules": reverse("pages:rules"),
+    }
+
+
+def test_middleware_is_enabled():
+    assert "core.budgets.QueryBudgetMiddleware" in settings.MIDDLEWARE
+
+
+@pytest.mark.parametrize("as_user", (False, True))
+def test_pages_fit_query_budgets(
+        client, user_client, another_user_client, seeded, as_user
+):
+    for url_name, url in get_urls(*seeded).items():
+        for http_client in (
+            (user_client, another_user_client) if as_user else (client,)
+        ):
+            try:
+                http_client.get(url)
+            except QueryBudgetExceeded as error:
+                raise AssertionError(
+                    f"Убедитесь, что страница `{url}` укладывается в бюджет"
+                    f" запросов к базе данных:\n{error}"
+                )
+
+
+def test_new_connection_setup_is_not_counted(settings, client, seeded):
+    # Внутри транзакции теста меняются не все PRAGMA.
+    settings.SQLITE_PRAGMAS = {
+        name: settings.SQLITE_PRAGMAS[name]
+        for name in ("busy_timeout", "cache_size", "temp_store")
+    }
+    connections.close_all()
+    stack, counter = count_queries()
+    with stack:
+        # Тестовая база в памяти не переоткрывается после close_all(),
+        # поэтому настройку нового соединения вызываем явно.
+        connection_created.send(
+            sender=connection.__class__, connection=connection
+        )
+        client.get(reverse("blog:index"))
+    assert len(counter.queries) <= settings.QUERY_BUDGETS["blog:index"], (
+        "Убедитесь, что PRAGMA нового соединения не учитываются в бюджете"
+        " запросов к базе данных:\n" + "\n".join(counter.queries)
+    )
+
+
+def test_writes_fit_query_budgets(user_client, seeded):
+    post, comment = seeded
+    urls = get_urls(post, comment)
+    try:
+        user_client.post(
+            reverse("blog:add_comment", kwargs={"post_id": post.id}),
+            {"text": "Новый комментарий"},
+        )
+        user_client.post(urls["blog:edit_comment"], {"text": "Исправлено"})
+        user_client.post(urls["blog:edit_post"], {
+            "title": "Новый заголовок",
+            "text": "Новый текст",
+            "pub_date": post.pub_date.strftime("%Y-%m-%d %H:%M"),
+            "category": post.category.id,
+        })
+        user_client.post(urls["blog:delete_comment"])
+        user_client.post(urls["blog:delete_post"])
+    except QueryBudgetExceeded as error:
+        raise AssertionError(
+            "Убедитесь, что изменения укладываются в бюджет запросов к базе"
+            f" данных:\n{error}"
+        )
+
+
+def test_exceeded_budget_raises(settings, client, seeded):
+    settings.QUERY_BUDGETS = {**settings.QUERY_BUDGETS, "blog:index": 0}
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(reverse("blog:index"))
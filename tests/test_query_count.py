@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.visibility import get_next_publication
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client: Client, url: str, expected_status: int = 200):
+    get_next_publication()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == expected_status
+    return [query["sql"] for query in ctx.captured_queries]
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location, another_user):
+    mixer.cycle(5).blend(
+        "blog.Comment", post=post_with_published_location, author=another_user
+    )
+    return post_with_published_location
+
+
+def test_post_detail_queries_anonymous(client, commented_post):
+    queries = count_queries(client, f"/posts/{commented_post.id}/")
+    assert len(queries) == 2, (
+        "Убедитесь, что страница публикации загружает публикацию с автором,"
+        " категорией и местоположением одним запросом, а комментарии —"
+        " вторым. Выполнены запросы:\n" + "\n".join(queries)
+    )
+
+
+def test_post_detail_queries_logged_in(user_client, commented_post):
+    # Сессия и пользователь, затем публикация и комментарии.
+    queries = count_queries(user_client, f"/posts/{commented_post.id}/")
+    assert len(queries) == 4, "\n".join(queries)
+
+
+def test_post_detail_hides_invisible_post_in_sql(
+        client, user_client, another_user_client, commented_post
+):
+    commented_post.is_published = False
+    commented_post.save()
+    url = f"/posts/{commented_post.id}/"
+    assert len(count_queries(client, url, expected_status=404)) == 1
+    count_queries(another_user_client, url, expected_status=404)
+    count_queries(user_client, url)
+
+
+def test_post_edit_pages_load_post_once(user_client, commented_post):
+    for url in (
+        f"/posts/{commented_post.id}/edit/",
+        f"/posts/{commented_post.id}/delete/",
+    ):
+        queries = count_queries(user_client, url)
+        post_queries = [sql for sql in queries if 'FROM "blog_post"' in sql]
+        assert len(post_queries) == 1, (
+            f"Убедитесь, что страница `{url}` загружает публикацию один раз"
+            " за запрос. Выполнены запросы:\n" + "\n".join(queries)
+        )
+
+
+def test_feed_pages_load_owner_once(
+        user_client, another_user_client, commented_post
+):
+    profile_url = f"/profile/{commented_post.author.username}/"
+    for client, url, lookup, expected in (
+        (
+            user_client,
+            f"/category/{commented_post.category.slug}/",
+            '"blog_category"."slug" =',
+            1,
+        ),
+        (another_user_client, profile_url, '"auth_user"."username" =', 1),
+        # Свой профиль берётся из уже загруженного пользователя запроса.
+        (user_client, profile_url, '"auth_user"."username" =', 0),
+    ):
+        queries = count_queries(client, url)
+        lookups = [sql for sql in queries if lookup in sql]
+        assert len(lookups) == expected, (
+            f"Убедитесь, что страница `{url}` загружает свою категорию или"
+            " пользователя один раз за запрос. Выполнены запросы:\n"
+            + "\n".join(queries)
+        )
@@ -0,0 +1,70 @@
+from typing import List, Tuple
+
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def is_forbidden_step(step: str) -> bool:
+    # An ordered walk over an index (``SCAN t USING INDEX i``) is how
+    # SQLite reads a LIMITed feed from a partial index; only bare table
+    # scans and temporary sorts are regressions.
+    if step.startswith("USE TEMP B-TREE"):
+        return True
+    return step.startswith("SCAN ") and " USING " not in step
+
+
+def get_query_plans(
+        client: Client, url: str
+) -> Tuple[List[Tuple[str, List[str]]], HttpResponse]:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    plans = []
+    with connection.cursor() as cursor:
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT"):
+                continue
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+    return plans, response
+
+
+def assert_indexed(client: Client, url: str) -> HttpResponse:
+    plans, response = get_query_plans(client, url)
+    for sql, steps in plans:
+        bad_steps = [step for step in steps if is_forbidden_step(step)]
+        assert not bad_steps, (
+            f"Убедитесь, что запросы страницы `{url}` обслуживаются"
+            f" индексами. План запроса\n{sql}\nсодержит {bad_steps}."
+        )
+    return response
+
+
+@pytest.mark.parametrize("logged_in", (False, True))
+def test_feed_query_plans(
+        logged_in, client, user_client, many_posts_with_published_locations,
+        comment_to_a_post
+):
+    client = user_client if logged_in else client
+    post = many_posts_with_published_locations[0]
+    for url in (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ):
+        response = assert_indexed(client, url)
+        page_obj = response.context["page_obj"]
+        response = assert_indexed(
+            client, f"{url}?after={page_obj.next_cursor}"
+        )
+        page_obj = response.context["page_obj"]
+        assert_indexed(client, f"{url}?before={page_obj.previous_cursor}")
+    assert_indexed(client, f"/posts/{comment_to_a_post.post.id}/")
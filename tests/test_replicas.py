@@ -0,0 +1,115 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connections
+
+from blog.cache import page_cache_key
+from core.routers import PRIMARY_COOKIE, ReplicaRouter, set_replica_snapshot
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replica(settings):
+    """Реплика в тестах — то же соединение, что и основная база."""
+    settings.READ_REPLICAS = ["replica"]
+    replica_connection = connections["replica"]
+    connections["replica"] = connections["default"]
+    yield
+    connections["replica"] = replica_connection
+
+
+@pytest.fixture
+def read_aliases(monkeypatch):
+    """Базы, выбранные роутером для чтения публикаций и комментариев."""
+    aliases = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        alias = db_for_read(self, model, **hints)
+        if model._meta.model_name in ("post", "comment"):
+            aliases.append(alias)
+        return alias
+
+    monkeypatch.setattr(ReplicaRouter, "db_for_read", spy)
+    return aliases
+
+
+def test_feeds_read_from_replica(
+        replica, read_aliases, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ):
+        read_aliases.clear()
+        assert user_client.get(url).status_code == 200
+        assert read_aliases and set(read_aliases) == {"replica"}, (
+            f"Убедитесь, что страница `{url}` читает публикации из реплики."
+        )
+
+
+def test_read_your_writes(
+        replica, read_aliases, settings, user_client,
+        post_with_published_location
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Свежий комментарий"}
+    )
+    cookie = response.cookies[PRIMARY_COOKIE]
+    assert cookie["max-age"] == settings.READ_YOUR_WRITES_SECONDS, (
+        "Убедитесь, что после записи пользователь читает из основной базы"
+        " READ_YOUR_WRITES_SECONDS секунд."
+    )
+    read_aliases.clear()
+    assert user_client.get(f"/posts/{post.id}/").status_code == 200
+    assert read_aliases and set(read_aliases) == {"default"}, (
+        "Убедитесь, что после записи страницы читаются из основной базы."
+    )
+
+
+def test_without_replicas_reads_primary(
+        read_aliases, client, post_with_published_location
+):
+    assert client.get("/").status_code == 200
+    assert read_aliases and set(read_aliases) == {"default"}
+
+
+def test_lagging_replica_fills_no_caches(
+        replica, client, post_with_published_location
+):
+    post = post_with_published_location
+    set_replica_snapshot("replica", 0)
+    response = client.get("/")
+    assert response.status_code == 200
+    assert not response.has_header("ETag") and not response.has_header(
+        "Last-Modified"
+    ), (
+        "Убедитесь, что страница из отстающей реплики отдаётся без ETag"
+        " и Last-Modified."
+    )
+    assert cache.get(page_cache_key("/")) is None, (
+        "Убедитесь, что страница из отстающей реплики не кэшируется."
+    )
+    assert response.context["page_obj"][0].card_version is None
+    assert not cache.get(
+        make_template_fragment_key("post_card", [post.pk, None])
+    ), "Убедитесь, что карточка из отстающей реплики не кэшируется."
+
+
+def test_fresh_replica_fills_caches(
+        replica, client, post_with_published_location
+):
+    set_replica_snapshot("replica", time.time_ns() + 60 * 10 ** 9)
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.has_header("ETag")
+    assert cache.get(page_cache_key("/")) is not None, (
+        "Убедитесь, что страница из актуальной реплики кэшируется."
+    )
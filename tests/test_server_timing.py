@@ -0,0 +1,52 @@
+import re
+
+import pytest
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+METRIC_RE = re.compile(r'^(\w+);dur=(\d+\.\d)(?:;desc="[^"]*")?$')
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for item in header.split(", "):
+        match = METRIC_RE.match(item)
+        assert match, f"Некорректная метрика Server-Timing: `{item}`"
+        metrics[match[1]] = float(match[2])
+    return metrics
+
+
+@pytest.mark.parametrize("url_name", ("blog:index", "pages:about"))
+def test_server_timing_header(client, url_name, post_with_published_location):
+    response = client.get(reverse(url_name))
+    assert "Server-Timing" in response, (
+        f"Убедитесь, что ответ `{url_name}` содержит заголовок Server-Timing."
+    )
+    metrics = parse_server_timing(response["Server-Timing"])
+    assert set(metrics) == {"db", "cache", "template", "view", "total"}
+    parts = metrics["db"] + metrics["cache"] + metrics["template"]
+    assert parts <= metrics["total"] + 0.3, (
+        "Убедитесь, что составляющие Server-Timing не пересекаются."
+    )
+
+
+def test_server_timing_counts_queries(
+        user_client, post_with_published_location
+):
+    response = user_client.get(reverse("blog:index"))
+    assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* queries"',
+                     response["Server-Timing"])
+
+
+def test_server_timing_only_for_site_views(admin_client):
+    response = admin_client.get("/admin/")
+    assert "Server-Timing" not in response
+
+
+def test_server_timing_can_be_disabled(settings, client):
+    settings.SERVER_TIMING = False
+    response = client.get(reverse("blog:index"))
+    assert "Server-Timing" not in response, (
+        "Убедитесь, что настройка SERVER_TIMING отключает заголовок."
+    )
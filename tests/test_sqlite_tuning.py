@@ -0,0 +1,22 @@
+import pytest
+from django.db import connection
+
+from core.db import apply_sqlite_pragmas
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_connection_pragmas(settings):
+    with connection.cursor() as cursor:
+        # Тестовая база в памяти: mmap_size и WAL к ней не применяются.
+        for name in ("busy_timeout", "cache_size"):
+            cursor.execute(f"PRAGMA {name}")
+            assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS[name], (
+                f"Убедитесь, что PRAGMA {name} применяется к каждому"
+                " соединению с SQLite."
+            )
+
+
+def test_unknown_pragma_is_rejected():
+    with connection.cursor() as cursor, pytest.raises(ValueError):
+        apply_sqlite_pragmas(cursor, {"writable_schema": "ON"})
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.rendering import render_excerpt, render_html
+from blog.visibility import (
+    get_next_publication, posts_became_visible, publish_due_posts
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_visibility_follows_post_and_category(
+        mixer, user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    assert Post.objects.visible().filter(pk=post.pk).exists()
+
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.objects.visible().filter(pk=post.pk).exists(), (
+        "Убедитесь, что публикации скрываются из лент при снятии категории"
+        " с публикации."
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    post.is_published = False
+    post.save()
+    assert not Post.objects.visible().filter(pk=post.pk).exists()
+
+    post.is_published = True
+    post.save()
+    published_category.delete()
+    assert not Post.objects.visible().filter(pk=post.pk).exists(), (
+        "Убедитесь, что публикации без категории не видны в лентах."
+    )
+
+
+def test_partial_save_updates_derived_fields(
+        mixer, user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    post.is_published = False
+    post.save(update_fields=["is_published"])
+    assert not Post.objects.visible().filter(pk=post.pk).exists(), (
+        "Убедитесь, что save(update_fields=[...]) пересчитывает is_visible,"
+        " если среди полей есть те, от которых он зависит."
+    )
+    post.text = "Новый текст публикации"
+    post.save(update_fields=["text"])
+    post.refresh_from_db()
+    assert (post.excerpt, post.text_html) == (
+        render_excerpt(post.text), render_html(post.text)
+    ), (
+        "Убедитесь, что save(update_fields=['text']) обновляет excerpt"
+        " и text_html."
+    )
+
+
+def test_scheduled_post_becomes_visible(mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(hours=1)
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    assert publish_due_posts() == 0
+    assert not Post.objects.visible().filter(pk=post.pk).exists()
+
+    assert publish_due_posts(pub_date + timedelta(seconds=1)) == 1, (
+        "Убедитесь, что отложенная публикация появляется в лентах, когда"
+        " наступает время её публикации."
+    )
+    assert Post.objects.visible().filter(pk=post.pk).exists()
+
+
+def test_publish_scheduled_command_sends_event(
+        mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(minutes=1),
+    )
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    received = []
+
+    def receiver(sender, post_ids, **kwargs):
+        received.extend(post_ids)
+
+    posts_became_visible.connect(receiver)
+    try:
+        call_command("publish_scheduled", "--once")
+    finally:
+        posts_became_visible.disconnect(receiver)
+    assert received == [post.pk], (
+        "Убедитесь, что планировщик рассылает событие о появлении"
+        " отложенной публикации в лентах."
+    )
+
+
+def test_category_changes_reset_schedule(mixer, user):
+    category = mixer.blend("blog.Category", is_published=False)
+    pub_date = timezone.now() + timedelta(hours=1)
+    post = mixer.blend(
+        "blog.Post", author=user, category=category, pub_date=pub_date,
+    )
+    assert get_next_publication() is None
+
+    category.is_published = True
+    category.save()
+    assert publish_due_posts(pub_date + timedelta(seconds=1)) == 1, (
+        "Убедитесь, что после публикации категории её отложенные"
+        " публикации появляются в лентах в назначенное время."
+    )
+    assert Post.objects.visible().filter(pk=post.pk).exists()